@@ -1,6 +1,9 @@
 
 dtc -@ -O dtb -I dts -o power-5A.dtbo power-5A.dts
 
-eepmake  -v1 eeprom_navhat.txt eeprom_navhat.eep power-5A.dtbo
+# calibration atom with nominal values unless a board specific one exists
+[ -f calibration.bin ] || PYTHONPATH=../python python3 -m navhat.calibration -f calibration.bin
+
+eepmake  -v1 eeprom_navhat.txt eeprom_navhat.eep power-5A.dtbo -c calibration.bin
 
 sudo eepflash.sh -w -f eeprom_navhat.eep -d=9 -t=24c64
@@ -0,0 +1,8 @@
+"""
+Drivers and tools for the Navigation HAT.
+
+The modules are imported on demand, for example ``from navhat import tps2h``. The package itself imports nothing, so
+the start of one-shot commands like ``navhat on 0`` stays short.
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,395 @@
+"""
+This module provides a basic interface to the Texas Instruments ADS1119 analogue to digital converter.
+It inherits the I2C read and write access from the i2c_device module.
+
+Christian Schilling     September 2024
+"""
+
+import time
+import errno
+from . import calibration, i2c_device
+
+# register description
+ADS119_RESET        = 0x06 
+ADS119_START_SYNC   = 0x08
+ADS119_POWERDOWN    = 0x02
+ADS119_READ_DATA    = 0x10
+ADS119_READ_REG     = 0x20
+ADS119_READ_BUSY    = 0x24
+ADS119_WRITEREG     = 0x40
+
+# polling of the conversion status in read_data, the delay is one conversion period but at least READ_DELAY
+READ_RETRIES        = 5
+READ_DELAY          = 0.0005
+
+# samples per second of the datarate settings 0 ... 3
+DATARATES           = (20, 90, 330, 1000)
+
+# auto-ranging: full scale code and the fraction of the gain 4 range a reading at gain 1 has to stay below to switch up
+FULL_SCALE          = 0x8000
+SATURATION          = 0x7fff
+HEADROOM            = 0.8
+
+
+def _signed(bval):
+    # 16 bit two's complement to int
+    return bval - 0x10000 if bval & 0x8000 else bval
+
+
+def datarate_for(rate):
+    """
+    Selects the slowest datarate setting which supports an update rate. Slower datarates have lower noise.
+
+    :param rate: required update rate in [Hz], None for the lowest noise.
+    :type rate: float
+    :return: datarate setting 0 ... 3.
+    :rtype: int
+    """
+    if rate is None:
+        return 0
+    for datarate, sps in enumerate(DATARATES):
+        if sps >= rate:
+            return datarate
+    return len(DATARATES) - 1
+
+
+class ADS1119(i2c_device.i2c_device):
+    """
+    Provides an interface to the ADC based on the information of the I2C bus and the device address.
+    The voltage reference is taken from the calibration of the board, see calibration.load().
+
+    :param bus: the I2C bus of the connected device. For example 1 or i2c-1
+    :type bus: int or str
+    :param addr: address of the device. Like 0x20 for a port extender
+    :type addr: int in the range of 0x08 ... 0x77
+    :param verbose: setting for printing verbosity information to the console, defaults to False.
+    :type verbose: boolean
+    :param retries: number of additional attempts after a failed I2C transaction, defaults to i2c_device.RETRIES.
+    :type retries: int
+    :param timeout: deadline of a single I2C call in [s], defaults to i2c_device.TIMEOUT.
+    :type timeout: float
+    """
+    def __init__(self, bus_number, i2c_addr, verbose = False, retries = i2c_device.RETRIES, timeout = i2c_device.TIMEOUT):
+        super().__init__(bus_number, i2c_addr, verbose, retries, timeout)
+        self.verbose = verbose
+        
+        # configuration options
+        self.gain = 1
+        self.datarate = 0
+        self.mux = 0
+        self.ext_vref = 0
+        self.continous = 1
+        
+        # parameters
+        self.vref = calibration.load().vref
+
+        # gain selected by auto-ranging for each signal, the configuration register as last written and if converting
+        self.ranges = {}
+        self.config = None
+        self.running = False
+    
+    def reset(self):
+        """
+        Resets the ADC via its reset command over the I2C bus.
+        """
+        if self.verbose:
+            print("Resetting ADS1119")
+        self.write(ADS119_RESET, [])
+
+        # configuration reset values
+        self.config = None
+        self.running = False
+        self.gain = 1
+        self.datarate = 0
+        self.mux = 0
+        self.ext_vref = 0
+        self.continous = 0
+        return self
+        
+    def power_down(self):
+        """
+        shuts down the ADC in sleep mode.
+        """
+        if self.verbose:
+            print("Power down ADS1119")
+        self.write(ADS119_POWERDOWN, [])
+        self.running = False
+        return self
+    
+    def start(self, continous = True):
+        """
+        Starts the ADC. This can be done for a single measurement of for continous sampling.
+        
+        :param continous: Flag for continous sampling, defaults to True.
+        :type continous: boolean
+        """
+        self.continous = continous
+        if self.verbose:
+            print("Starting ADS1119, continous=", self.continous)
+        self.write(ADS119_START_SYNC, [])
+        self.running = True
+        return self
+        
+    def read_data(self, timeout = None):
+        """
+        Reads the last result from the ADC. Polling the conversion status and reading the result share one deadline.
+        
+        :param timeout: deadline of the whole call in [s], defaults to read_timeout().
+        :type timeout: float
+        :return: last measured value.
+        :rtype: integer, 16Bit two's complement value.
+        :raises i2c_device.I2CTimeout: if no conversion result gets ready before the deadline.
+        """
+        deadline = time.monotonic() + (self.read_timeout() if timeout is None else timeout)
+        while True:
+            if self.data_ready(self._remaining(deadline)):
+                blk = self.read(ADS119_READ_DATA, 2, self._remaining(deadline))
+                value = (blk[0] << 8) + blk[1]
+                return value
+            time.sleep(min(self._read_delay(), self._remaining(deadline)))
+
+    def read_timeout(self):
+        """
+        :return: default deadline of read_data() in [s], polling READ_RETRIES times plus the timeout of one transfer.
+        :rtype: float
+        """
+        return READ_RETRIES * self._read_delay() + self.timeout
+
+    def _remaining(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise i2c_device.I2CTimeout(errno.ETIMEDOUT, "ADS1119 at 0x%02x has no conversion result ready" % (self.addr))
+        return remaining
+        
+    def write_reg(self, val):
+        """
+        Writes to the configuration register.
+        
+        :param val: bit pattern for the configuration register.
+        :type val: integer, 8 bits only
+        """
+        if self.verbose:
+            print("Writing configuration ADS1119: %02x" % (val))
+        self.write(ADS119_WRITEREG, [val & 0xff])
+        return self
+
+    def configure(self):
+        """
+        Configures the configuration register based on gain, datarate, input multiplexer and voltge reference.
+        These parameters are hold in the object.
+        """
+        # check configuration parameters in correct range
+        assert(self.gain == 1 or self.gain == 4)
+        assert(self.datarate >= 0 and self.datarate <4)
+        assert(self.mux >= 0 and self.mux <8)
+        assert(self.ext_vref == 0 or self.ext_vref == 1)
+        assert(self.continous == 0 or self.continous == 1)
+        
+        config = self._config_value()
+        self.write_reg(config)
+        self.config = config
+
+    def _config_value(self):
+        if self.gain == 1:
+            gainval = 0x00
+        else:
+            gainval = 0x10
+        return self.ext_vref | (self.continous << 1) | (self.datarate << 2) | (gainval) | (self.mux << 5)
+        
+    def read_register(self):
+        """
+        Reads the configuration register of the ADC.
+        
+        :return: configuration value.
+        :rtype: integer, 8bit only
+        """
+        blk = self.read(ADS119_READ_REG, 1)
+        if self.verbose:
+            print("Read configuration of ADS1119 %02x" % (blk[0]))
+        return blk[0]
+
+    def data_ready(self, timeout = None):
+        """
+        Reads the conversion status of the ADC. Information is read from the busy register.
+        
+        :param timeout: deadline of the call in [s], defaults to the timeout of the device.
+        :type timeout: float
+        :return: conversion status, reads True if a new reading is available, reads False if conversion data are read.
+        :rtype: boolean
+        """
+        blk = self.read(ADS119_READ_BUSY, 1, timeout)
+        if self.verbose:
+            print("Ready register: %02x" % (blk[0]))
+        ready = (blk[0] & 0x80) != 0
+        return ready
+        
+    def read_voltage(self):
+        """
+        Reads the measured voltage from the ADC in Volts. The result is depending on the measured value, the gain and the voltage reference.
+        
+        :return: last measured voltage in [v].
+        :rtype: float
+        """
+        bval = self.read_data()
+        return self._voltage(bval)
+
+    def _voltage(self, bval):
+        v = self.vref * _signed(bval) / (self.gain * FULL_SCALE)
+        return v
+
+    def _read_delay(self):
+        return max(READ_DELAY, 1.0 / DATARATES[self.datarate])
+
+    def resolution(self):
+        """
+        The voltage of one LSB with the current gain and voltage reference. The noise of the ADS1119 stays below one LSB
+        at all datarates, so this is the effective resolution of a reading.
+        
+        :return: resolution in [V].
+        :rtype: float
+        """
+        return self.vref / (self.gain * FULL_SCALE)
+
+    def _select_range(self, key, rate):
+        # gain and datarate of the next conversion of a signal
+        self.gain = self.ranges.get(key, 1)
+        self.datarate = datarate_for(rate)
+
+    def _check_range(self, key, bval):
+        # keeps the gain for the next reading of the signal, returns True if the reading needs to be repeated
+        code = abs(_signed(bval))
+        if self.gain == 4 and code >= SATURATION:
+            self.ranges[key] = 1
+            return True
+        if self.gain == 1 and code < HEADROOM * SATURATION / 4:
+            self.ranges[key] = 4
+        else:
+            self.ranges[key] = self.gain
+        return False
+
+    def _restart(self):
+        # applies a changed configuration and discards a result converted with the previous one. In continuous mode
+        # with an unchanged configuration the next result of the running conversions is taken.
+        if self.running and self.continous and self.config == self._config_value():
+            return
+        self.configure()
+        self.start(self.continous)
+        self.read(ADS119_READ_DATA, 2)
+
+    def read_auto(self, key = None, rate = None):
+        """
+        Measures with auto-ranging. Gain 4 is used if the previous reading of the signal fits into its range with some headroom,
+        otherwise gain 1. A saturated reading at gain 4 is repeated at gain 1. The datarate is the slowest one supporting
+        the required update rate, which gives the best noise. The ADC is only restarted if gain, datarate or input change,
+        so in continuous mode a reading takes about one conversion period.
+        
+        :param key: identifies the signal for keeping its gain, for example a TPS2H channel. Defaults to the input multiplexer setting.
+        :type key: hashable
+        :param rate: required update rate of the signal in [Hz], defaults to None for the lowest noise.
+        :type rate: float
+        :return: measured voltage in [V] and its resolution in [V].
+        :rtype: tuple of float
+        """
+        if key is None:
+            key = self.mux
+        self._select_range(key, rate)
+        while True:
+            self._restart()
+            bval = self.read_data()
+            if not self._check_range(key, bval):
+                break
+            self.gain = self.ranges[key]
+        if self.verbose:
+            print("ADS1119 auto range: key, gain, datarate", key, self.gain, self.datarate)
+        return self._voltage(bval), self.resolution()
+
+    # asyncio counterparts, bus transactions run on the executor of the I2C bus
+    async def reset_async(self):
+        return await self.run_async(self.reset)
+
+    async def power_down_async(self):
+        return await self.run_async(self.power_down)
+
+    async def start_async(self, continous = True):
+        return await self.run_async(self.start, continous)
+
+    async def write_reg_async(self, val):
+        return await self.run_async(self.write_reg, val)
+
+    async def configure_async(self):
+        return await self.run_async(self.configure)
+
+    async def read_register_async(self):
+        return await self.run_async(self.read_register)
+
+    async def data_ready_async(self, timeout = None):
+        return await self.run_async(self.data_ready, timeout)
+
+    async def read_data_async(self, timeout = None):
+        """
+        asyncio counterpart of read_data(). Waiting for the conversion does not block the event loop.
+        
+        :param timeout: deadline of the whole call in [s], defaults to read_timeout().
+        :type timeout: float
+        :return: last measured value.
+        :rtype: integer, 16Bit two's complement value.
+        :raises i2c_device.I2CTimeout: if no conversion result gets ready before the deadline.
+        """
+        import asyncio
+        deadline = time.monotonic() + (self.read_timeout() if timeout is None else timeout)
+        while True:
+            if await self.data_ready_async(self._remaining(deadline)):
+                blk = await self.read_async(ADS119_READ_DATA, 2, self._remaining(deadline))
+                value = (blk[0] << 8) + blk[1]
+                return value
+            await asyncio.sleep(min(self._read_delay(), self._remaining(deadline)))
+
+    async def read_voltage_async(self):
+        """
+        asyncio counterpart of read_voltage().
+        
+        :return: last measured voltage in [v].
+        :rtype: float
+        """
+        bval = await self.read_data_async()
+        return self._voltage(bval)
+
+    async def read_auto_async(self, key = None, rate = None):
+        """
+        asyncio counterpart of read_auto().
+        
+        :return: measured voltage in [V] and its resolution in [V].
+        :rtype: tuple of float
+        """
+        if key is None:
+            key = self.mux
+        self._select_range(key, rate)
+        while True:
+            await self.run_async(self._restart)
+            bval = await self.read_data_async()
+            if not self._check_range(key, bval):
+                break
+            self.gain = self.ranges[key]
+        return self._voltage(bval), self.resolution()
+
+if __name__ == '__main__':
+    
+
+    from . import board
+    profile = board.load()
+    ads=ADS1119(profile.bus, profile.address("ads1119"))
+    ads.reset()
+    ads.continous = 1
+    ads.configure()
+    ads.start()
+    time.sleep(0.2)
+    
+    print("read: ", ads.data_ready(), ads.read_register(), ads.read_data())
+    time.sleep(0.1)
+    print("read: ", ads.data_ready(), ads.read_register(), ads.read_data())
+    time.sleep(0.1)
+    print("read: ", ads.data_ready(), ads.read_register(), ads.read_data())
+    time.sleep(0.1)
+
+    v = ads.read_voltage()
+    
@@ -0,0 +1,170 @@
+"""
+Discovery of the devices on the Navigation HAT.
+
+The signal I2C_ADDR0 raises the addresses of the BMP390, the ADS1119 and the MCP23017 by one. discover() probes the
+bus to find the A0 setting and the devices present. load() keeps the result as board profile in a cache file, later
+calls do not probe again. The cached profile is discarded if another HAT is installed, recognized by the UUID of its
+EEPROM, or if a different bus is requested.
+
+Christian Schilling     October 2026
+"""
+
+import json
+import os
+
+# I2C bus of the 40 pin header
+SMBUS_NUMBER = 1
+
+# base address of each device and if it is raised by A0
+DEVICES = {
+    "mcp23017": (0x22, True),
+    "ads1119":  (0x48, True),
+    "bmp390":   (0x76, True),
+    "max31343": (0x68, False),
+}
+
+# devices driving the power outputs, a profile without them is not cached
+REQUIRED = ("mcp23017", "ads1119")
+
+HAT_UUID = "/proc/device-tree/hat/uuid"
+CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "navhat", "board.json")
+
+
+class Profile:
+    """
+    The devices found on one board.
+
+    :param bus: the I2C bus of the board.
+    :type bus: int
+    :param a0: setting of I2C_ADDR0, 0 or 1.
+    :type a0: int
+    :param devices: address of each device found, by name.
+    :type devices: dict
+    :param uuid: UUID of the HAT EEPROM, None if not available.
+    :type uuid: str
+    """
+    def __init__(self, bus, a0, devices, uuid = None):
+        self.bus = bus
+        self.a0 = a0
+        self.devices = devices
+        self.uuid = uuid
+
+    def address(self, name):
+        """
+        :param name: name of the device, a key of DEVICES.
+        :type name: str
+        :return: the I2C address of the device.
+        :rtype: int
+        :raises LookupError: if the device was not found on the board.
+        """
+        if name not in self.devices:
+            raise LookupError("%s not found on I2C bus %s, try a rescan" % (name, self.bus))
+        return self.devices[name]
+
+    def complete(self):
+        """
+        :return: True if the devices of REQUIRED were found. Otherwise the board may not have been powered or the bus was busy.
+        :rtype: boolean
+        """
+        return all(name in self.devices for name in REQUIRED)
+
+    def to_dict(self):
+        return {"bus": self.bus, "a0": self.a0, "devices": self.devices, "uuid": self.uuid}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["bus"], d["a0"], d["devices"], d.get("uuid"))
+
+    def __repr__(self):
+        devices = ", ".join("%s=0x%02x" % (name, addr) for name, addr in sorted(self.devices.items()))
+        return "Profile(bus=%s, a0=%d, %s)" % (self.bus, self.a0, devices)
+
+
+def _uuid():
+    try:
+        with open(HAT_UUID, "rb") as f:
+            return f.read().rstrip(b"\0").decode()
+    except OSError:
+        return None
+
+
+def probe(bus, addr):
+    """
+    Checks if a device acknowledges its address.
+
+    :param bus: an open smbus.SMBus object.
+    :param addr: address of the device.
+    :type addr: int
+    :return: True if the device answered.
+    :rtype: boolean
+    """
+    try:
+        bus.read_byte(addr)
+        return True
+    except OSError:
+        return False
+
+
+def discover(bus_number = SMBUS_NUMBER):
+    """
+    Probes the bus for the devices of the board. The A0 setting is taken from the first device of the MCP23017 and
+    the ADS1119 found at its raised address.
+
+    :param bus_number: the I2C bus of the board, defaults to SMBUS_NUMBER.
+    :type bus_number: int
+    :return: the profile of the board.
+    :rtype: Profile
+    """
+    import smbus
+    bus = smbus.SMBus(bus_number)
+    try:
+        a0 = 0
+        for name in ("mcp23017", "ads1119"):
+            base = DEVICES[name][0]
+            if probe(bus, base):
+                break
+            if probe(bus, base + 1):
+                a0 = 1
+                break
+        devices = {}
+        for name, (base, shifted) in DEVICES.items():
+            addr = base + a0 if shifted else base
+            if probe(bus, addr):
+                devices[name] = addr
+    finally:
+        bus.close()
+    return Profile(bus_number, a0, devices, _uuid())
+
+
+def load(bus_number = SMBUS_NUMBER, rescan = False, cache = CACHE):
+    """
+    Returns the board profile from the cache file, the bus is only probed if there is no valid one. A profile missing
+    a device of REQUIRED is not cached, so the bus is probed again by the next call.
+
+    :param bus_number: the I2C bus of the board, defaults to SMBUS_NUMBER.
+    :type bus_number: int
+    :param rescan: probes the bus even if a cached profile exists, defaults to False.
+    :type rescan: boolean
+    :param cache: file name of the cache, defaults to CACHE.
+    :type cache: str
+    :return: the profile of the board.
+    :rtype: Profile
+    """
+    if not rescan:
+        try:
+            with open(cache) as f:
+                profile = Profile.from_dict(json.load(f))
+            if profile.bus == bus_number and profile.uuid == _uuid() and profile.complete():
+                return profile
+        except (OSError, ValueError, KeyError):
+            pass
+    profile = discover(bus_number)
+    if not profile.complete():
+        return profile
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(cache, "w") as f:
+            json.dump(profile.to_dict(), f)
+    except OSError:
+        pass
+    return profile
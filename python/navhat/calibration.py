@@ -0,0 +1,211 @@
+"""
+Per board calibration of the power outputs and the ADC.
+
+The calibration is stored as a custom atom in the HAT EEPROM. It holds the variant of the high side switches, the
+sense resistor, the reference voltage of the ADC and an offset and gain for current and temperature of each output.
+The firmware exposes custom atoms as /proc/device-tree/hat/custom_<n>, load() searches them for the calibration and
+caches the result. Without calibration the nominal values of the design are used.
+
+The corrections are plain arithmetic, they apply to single readings as well as to NumPy arrays of samples.
+
+Run this module to create or show the custom atom file, configuration/build.sh adds it to the EEPROM image.
+
+Christian Schilling     October 2026
+"""
+
+import glob
+import struct
+
+# current sense ratio of the switch variants
+SNS_RATIO = {"TPS2HB16": 3000, "TPS2HB32": 2000}
+
+# nominal values of the design
+VARIANT = "TPS2HB16"
+SNS_RESISTOR = 750.0
+VREF = 2.048
+CHANNELS = 4
+
+# atom layout: magic, version, sense ratio, sense resistor, vref,
+# followed by current offset, current gain, temperature offset, temperature gain of each channel
+HEADER = struct.Struct("<4sHHff")
+TABLE = struct.Struct("<%df" % (4 * CHANNELS))
+MAGIC = b"NHCL"
+VERSION = 1
+
+HAT_ATOMS = "/proc/device-tree/hat/custom_*"
+
+_cached = None
+
+
+def _select(values, channel):
+    # a single channel or a NumPy array of channels, for blocks of samples of several outputs
+    if isinstance(channel, int):
+        return values[channel]
+    import numpy
+    return numpy.asarray(values)[channel]
+
+
+class Calibration:
+    """
+    Calibration values of one board. Without arguments the nominal values of the design are used.
+
+    :param variant: variant of the high side switches, a key of SNS_RATIO.
+    :type variant: str
+    :param sns_resistor: sense resistor in [Ohm].
+    :type sns_resistor: float
+    :param vref: reference voltage of the ADC in [V].
+    :type vref: float
+    """
+    def __init__(self, variant = VARIANT, sns_resistor = SNS_RESISTOR, vref = VREF):
+        assert variant in SNS_RATIO, "variant needs to be one of %s" % (", ".join(SNS_RATIO))
+        self.variant = variant
+        self.sns_resistor = sns_resistor
+        self.vref = vref
+        self.current_offset = [0.0] * CHANNELS
+        self.current_gain = [1.0] * CHANNELS
+        self.temperature_offset = [0.0] * CHANNELS
+        self.temperature_gain = [1.0] * CHANNELS
+
+    @property
+    def sns_ratio(self):
+        return SNS_RATIO[self.variant]
+
+    def current(self, voltage, channel):
+        """
+        Calculates the load current from the voltage across the sense resistor.
+
+        :param voltage: measured voltage [V], a number or a NumPy array.
+        :type voltage: float or numpy.ndarray
+        :param channel: the output the voltage was measured for, or a NumPy array of outputs matching the voltages.
+        :type channel: int or numpy.ndarray
+        :return: load current in [A].
+        :rtype: float or numpy.ndarray
+        """
+        i_sns = voltage / self.sns_resistor * self.sns_ratio
+        return i_sns * _select(self.current_gain, channel) + _select(self.current_offset, channel)
+
+    def temperature(self, voltage, channel):
+        """
+        Calculates the die temperature from the voltage across the sense resistor.
+        See section 9.3.3.2 of the TPS2H datasheet for details.
+
+        :param voltage: measured voltage [V], a number or a NumPy array.
+        :type voltage: float or numpy.ndarray
+        :param channel: the output the voltage was measured for, or a NumPy array of outputs matching the voltages.
+        :type channel: int or numpy.ndarray
+        :return: die temperature in [°C].
+        :rtype: float or numpy.ndarray
+        """
+        i_snst = voltage / self.sns_resistor * 1000.0  #mA
+        tj = (i_snst - 0.85) * 90.90909 + 25.0          #°C
+        return tj * _select(self.temperature_gain, channel) + _select(self.temperature_offset, channel)
+
+    def pack(self):
+        """
+        :return: the calibration as content of a custom atom.
+        :rtype: bytes
+        """
+        return HEADER.pack(MAGIC, VERSION, self.sns_ratio, self.sns_resistor, self.vref) + \
+            TABLE.pack(*(self.current_offset + self.current_gain + self.temperature_offset + self.temperature_gain))
+
+    @classmethod
+    def unpack(cls, data):
+        """
+        Creates a calibration from the content of a custom atom.
+
+        :param data: content of the atom.
+        :type data: bytes
+        :return: the calibration or None if the data are no calibration atom.
+        :rtype: Calibration
+        """
+        if len(data) < HEADER.size + TABLE.size:
+            return None
+        magic, version, ratio, sns_resistor, vref = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        variant = [name for name, r in SNS_RATIO.items() if r == ratio]
+        if not variant:
+            return None
+        cal = cls(variant[0], sns_resistor, vref)
+        table = list(TABLE.unpack_from(data, HEADER.size))
+        cal.current_offset = table[0:CHANNELS]
+        cal.current_gain = table[CHANNELS:2 * CHANNELS]
+        cal.temperature_offset = table[2 * CHANNELS:3 * CHANNELS]
+        cal.temperature_gain = table[3 * CHANNELS:]
+        return cal
+
+    def __repr__(self):
+        return "Calibration(variant=%s, sns_resistor=%g, vref=%g, current_offset=%s, current_gain=%s, temperature_offset=%s, temperature_gain=%s)" % \
+            (self.variant, self.sns_resistor, self.vref, self.current_offset, self.current_gain, self.temperature_offset, self.temperature_gain)
+
+
+def load(pattern = HAT_ATOMS, reload = False):
+    """
+    Loads the calibration from the custom atoms of the HAT EEPROM. The result is cached, later calls do not read again.
+
+    :param pattern: file pattern of the custom atoms, defaults to HAT_ATOMS.
+    :type pattern: str
+    :param reload: reads the atoms again instead of using the cached calibration, defaults to False.
+    :type reload: boolean
+    :return: calibration of the board, nominal values if none is found.
+    :rtype: Calibration
+    """
+    global _cached
+    if _cached is not None and not reload:
+        return _cached
+    cal = None
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "rb") as f:
+            cal = Calibration.unpack(f.read())
+        if cal is not None:
+            break
+    _cached = cal if cal is not None else Calibration()
+    return _cached
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='creates or shows the calibration atom for the HAT EEPROM of the Navigation HAT',
+        epilog='''
+            Examples:\n
+            python3 -m navhat.calibration --show                        shows the calibration of the installed HAT\n
+            python3 -m navhat.calibration --show -f calibration.bin     shows the calibration in an atom file\n
+            python3 -m navhat.calibration -f calibration.bin --vref 2.051 --current-gain 1.02 1.01 0.99 1.0\n
+            Unchanged values are taken from the given atom file if it exists.''')
+    parser.add_argument("-f", "--file", help="atom file to create or show, used by eepmake -c")
+    parser.add_argument("-s", "--show", help="shows the calibration", action="store_true")
+    parser.add_argument("--variant", help="variant of the high side switches", choices=sorted(SNS_RATIO))
+    parser.add_argument("--sns-resistor", help="sense resistor in Ohm", type=float)
+    parser.add_argument("--vref", help="reference voltage of the ADC in V", type=float)
+    parser.add_argument("--current-offset", help="current offset of each channel in A", type=float, nargs=CHANNELS)
+    parser.add_argument("--current-gain", help="current gain of each channel", type=float, nargs=CHANNELS)
+    parser.add_argument("--temperature-offset", help="temperature offset of each channel in °C", type=float, nargs=CHANNELS)
+    parser.add_argument("--temperature-gain", help="temperature gain of each channel", type=float, nargs=CHANNELS)
+    args = parser.parse_args()
+
+    if args.file:
+        cal = load(args.file)
+    else:
+        cal = load()
+
+    if args.show:
+        print(cal)
+        raise SystemExit(0)
+
+    if not args.file:
+        parser.error("an atom file is needed to write the calibration")
+    if args.variant:
+        cal.variant = args.variant
+    if args.sns_resistor:
+        cal.sns_resistor = args.sns_resistor
+    if args.vref:
+        cal.vref = args.vref
+    for name in ("current_offset", "current_gain", "temperature_offset", "temperature_gain"):
+        if getattr(args, name):
+            setattr(cal, name, getattr(args, name))
+    with open(args.file, "wb") as f:
+        f.write(cal.pack())
+    print(cal)
@@ -0,0 +1,153 @@
+"""
+The navhat command line tool.
+
+One-shot commands for scripts and the console: board status, switching the power outputs, measuring current and
+temperature of all outputs, the real time clock and the HAT EEPROM. The board profile is taken from the cache of
+board.load(). Drivers are imported by the command needing them only, so switching an output starts quickly.
+
+Christian Schilling     October 2026
+"""
+
+import argparse
+import sys
+
+from . import board
+
+HAT = "/proc/device-tree/hat/"
+
+
+def _outputs(args, profile, auto = False):
+    # port extender, ADC and switches with the state of the outputs read from the board
+    from . import ads1119, mcp23017, tps2h
+    io = mcp23017.MCP23017(profile.bus, profile.address("mcp23017"), args.verbose)
+    adc = ads1119.ADS1119(profile.bus, profile.address("ads1119"), args.verbose)
+    return tps2h.TPS2H(io, adc, args.verbose, auto=auto).setup()
+
+
+def _rtc(args, profile):
+    from . import max31343
+    return max31343.MAX31343(profile.bus, profile.address("max31343"), args.verbose)
+
+
+def _pattern(channel):
+    return " ".join("P%d:%s" % (k + 1, "on" if channel & (1 << k) else "off") for k in range(4))
+
+
+def status(args, profile):
+    print(profile)
+    if "mcp23017" in profile.devices and "ads1119" in profile.devices:
+        print("Outputs    : %s" % _pattern(_outputs(args, profile).channel))
+    if "max31343" in profile.devices:
+        rtc = _rtc(args, profile)
+        print("Time       : %s" % rtc.get_time())
+        print("Temperature: %3.2f °C" % rtc.temperature())
+
+
+def output(args, profile):
+    sw = _outputs(args, profile)
+    for channel in args.channels:
+        if args.command == "on":
+            sw.set_output(channel)
+        else:
+            sw.clear_output(channel)
+    print("Outputs    : %s" % _pattern(sw.channel))
+
+
+def sweep(args, profile):
+    sw = _outputs(args, profile, args.auto)
+    sw.adc.reset()
+    sw.adc.continous = 1
+    sw.adc.configure()
+    sw.adc.start()
+    result = sw.sweep() if args.settle is None else sw.sweep(args.settle)
+    for channel, reading in enumerate(result):
+        state = "on" if sw.channel & (1 << channel) else "off"
+        print("P%d %-3s %6.3f A ±%.4f %6.1f °C ±%.3f" % (channel + 1, state, reading.current, reading.current_resolution,
+                                                       reading.temperature, reading.temperature_resolution))
+
+
+def rtc(args, profile):
+    clock = _rtc(args, profile)
+    if args.set:
+        clock.set_time()
+    if args.alarm:
+        hour, minute = (int(v) for v in args.alarm.split(":"))
+        clock.set_alarm2(hour, minute)
+    print("Time       : %s" % clock.get_time())
+    print("Temperature: %3.2f °C" % clock.temperature())
+
+
+def signalk(args, profile):
+    from . import signalk
+    sw = _outputs(args, profile, auto=True)
+    sw.adc.reset()
+    sw.adc.continous = 1
+    sw.adc.configure()
+    sw.adc.start()
+    rtc = _rtc(args, profile) if "max31343" in profile.devices else None
+    if args.url:
+        stream = signalk.WebSocketStream(args.url)
+    else:
+        stream = signalk.TcpStream(args.host, args.port)
+    try:
+        signalk.run(signalk.Publisher(stream), sw, rtc, args.period)
+    except KeyboardInterrupt:
+        pass
+
+
+def eeprom(args, profile):
+    from . import calibration
+    for name in ("vendor", "product", "product_id", "product_ver", "uuid"):
+        try:
+            with open(HAT + name, "rb") as f:
+                print("%-11s: %s" % (name, f.read().rstrip(b"\0").decode()))
+        except OSError:
+            print("%-11s: not available" % (name))
+    print(calibration.load())
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog="navhat",
+        description="controls the Navigation HAT",
+        epilog='''
+            Examples:\n
+            navhat status               shows the devices, outputs and time\n
+            navhat on 0 2               switches on the outputs P1 and P3\n
+            navhat sweep                measures current and temperature of all outputs\n
+            navhat rtc --set            sets the RTC from the system time\n
+            navhat signalk              publishes to the Signal K server on this computer''')
+    parser.add_argument("-v", "--verbose", help="increase output verbosity", action="store_true")
+    parser.add_argument("-b", "--bus", help="the I2C bus of the board", type=int, default=board.SMBUS_NUMBER)
+    parser.add_argument("--rescan", help="probes the bus instead of using the cached board profile", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="shows the devices found, the outputs and the RTC").set_defaults(func=status)
+    for name in ("on", "off"):
+        p = commands.add_parser(name, help="switches %s power outputs" % name)
+        p.add_argument("channels", help="output channel 0 ... 3", type=int, nargs="+", choices=range(4))
+        p.set_defaults(func=output)
+    p = commands.add_parser("sweep", help="measures current and temperature of all outputs")
+    p.add_argument("--settle", help="settling time of the diagnostic mode in s, defaults to tps2h.DIAG_SETTLE", type=float)
+    p.add_argument("--auto", help="selects gain and datarate of the ADC for each reading", action="store_true")
+    p.set_defaults(func=sweep)
+    p = commands.add_parser("rtc", help="shows and sets the real time clock")
+    p.add_argument("--set", help="sets the RTC from the system time", action="store_true")
+    p.add_argument("--alarm", help="sets the daily wake-up alarm, HH:MM")
+    p.set_defaults(func=rtc)
+    commands.add_parser("eeprom", help="shows the HAT EEPROM information and calibration").set_defaults(func=eeprom)
+    p = commands.add_parser("signalk", help="publishes outputs and RTC temperature to a Signal K server")
+    p.add_argument("--host", help="host of the Signal K server", default="localhost")
+    p.add_argument("--port", help="TCP port of the Signal K server", type=int, default=8375)
+    p.add_argument("--url", help="WebSocket URL of the Signal K stream, used instead of TCP")
+    p.add_argument("--period", help="period of the readings in s, at least the time of one sweep", type=float, default=2.0)
+    p.set_defaults(func=signalk)
+
+    args = parser.parse_args(argv)
+    try:
+        profile = board.load(args.bus, args.rescan)
+        args.func(args, profile)
+    except (LookupError, OSError) as e:
+        print("navhat: %s" % e, file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,449 @@
+"""
+Streaming statistics and energy accounting for the power outputs.
+
+Readings, typically the load currents from TPS2H.sweep(), are fed sample by sample. Per channel the module keeps
+minimum, maximum, mean, RMS and the integrated charge in amp-hours for a one second bucket. Completed buckets are
+rolled up into one minute and one hour buckets. Each tier is written to its own file of fixed size records which
+is used as a ring, so the storage does not grow over a season. Queries over long periods read the hourly tier and
+only use the finer tiers for the partial hours and minutes at the edges of the period, or where a coarser bucket was
+not written yet.
+
+Christian Schilling     October 2026
+"""
+
+import math
+import os
+import struct
+import time
+
+# tiers as bucket length in s and how long the records are kept in s
+TIERS = ((1, 6 * 3600), (60, 31 * 24 * 3600), (3600, 5 * 366 * 24 * 3600))
+
+# samples further apart than this many sweep periods are not integrated, for example after a power down
+GAP = 5.0
+
+# file header: magic, version, record size, capacity in records, number of records ever written, channels
+HEADER = struct.Struct("<4sHHIQH10x")
+MAGIC = b"NHEA"
+VERSION = 2
+
+# header, per channel: first record of the finer tier not yet rolled up into a written record of this tier
+MARK = struct.Struct("<Q")
+
+# record: bucket start, channel, count, min, max, mean, rms, amp-hours, gaps not integrated in s
+RECORD = struct.Struct("<dHxxIffffdf")
+
+
+class Stats:
+    """
+    Running statistics of one channel in constant memory. Instances can be merged to combine buckets.
+    """
+    __slots__ = ("count", "min", "max", "sum", "sumsq", "ah", "gap")
+
+    def __init__(self):
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.ah = 0.0
+        self.gap = 0.0
+
+    def add(self, value, ah = 0.0, gap = 0.0):
+        """
+        Adds a single reading.
+
+        :param value: the reading, for example a current in [A].
+        :type value: float
+        :param ah: charge in [Ah] accumulated since the previous reading.
+        :type ah: float
+        :param gap: time in [s] since the previous reading if it was too long ago to integrate the charge.
+        :type gap: float
+        """
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+        self.sumsq += value * value
+        self.ah += ah
+        self.gap += gap
+        return self
+
+    def merge(self, other):
+        """
+        Adds the readings of another Stats object.
+
+        :param other: statistics to be added.
+        :type other: Stats
+        """
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.ah += other.ah
+        self.gap += other.gap
+        return self
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    @property
+    def rms(self):
+        return math.sqrt(self.sumsq / self.count) if self.count else math.nan
+
+    def __repr__(self):
+        return "Stats(count=%d, min=%g, max=%g, mean=%g, rms=%g, ah=%g, gap=%g)" % (self.count, self.min, self.max, self.mean, self.rms, self.ah, self.gap)
+
+
+class TierFile:
+    """
+    A file of fixed size records used as a ring. The file is created with its full size, old records are overwritten.
+    Records are appended in the order of their bucket start, so a period is found by binary search.
+
+    :param path: file name of the tier.
+    :type path: str
+    :param capacity: number of records held by the file.
+    :type capacity: int
+    :param channels: number of channels, defaults to 1.
+    :type channels: int
+    """
+    def __init__(self, path, capacity, channels = 1):
+        self.path = path
+        if os.path.exists(path):
+            self.f = open(path, "r+b")
+            magic, version, size, self.capacity, self.written, self.channels = HEADER.unpack(self.f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or size != RECORD.size:
+                raise ValueError("%s is not an energy tier file of version %d" % (path, VERSION))
+            if self.channels != channels:
+                raise ValueError("%s holds %d channels, not %d" % (path, self.channels, channels))
+            self.marks = [MARK.unpack(self.f.read(MARK.size))[0] for k in range(channels)]
+        else:
+            self.f = open(path, "w+b")
+            self.capacity = capacity
+            self.written = 0
+            self.channels = channels
+            self.marks = [0] * channels
+            self.f.truncate(HEADER.size + channels * MARK.size + capacity * RECORD.size)
+            self._write_header()
+        self.offset = HEADER.size + self.channels * MARK.size
+
+    def _write_header(self):
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.capacity, self.written, self.channels))
+        self.f.write(b"".join(MARK.pack(mark) for mark in self.marks))
+
+    @property
+    def first(self):
+        """
+        Index of the oldest record still held, records are counted from the creation of the file.
+        """
+        return max(0, self.written - self.capacity)
+
+    def append(self, start, channel, stats, marks = None):
+        """
+        Writes the statistics of a completed bucket as the next record.
+
+        :param marks: per channel the first record of the finer tier not contained in a written record of this tier.
+        :type marks: list of int
+        """
+        self.f.seek(self.offset + (self.written % self.capacity) * RECORD.size)
+        self.f.write(RECORD.pack(start, channel, stats.count, stats.min, stats.max, stats.mean, stats.rms, stats.ah,
+                                 stats.gap))
+        self.written += 1
+        if marks is not None:
+            self.marks = marks
+        self._write_header()
+
+    def read(self, first, last):
+        """
+        Reads the records from index first up to last, excluding last.
+
+        :return: index, bucket start, channel and statistics of each record, oldest first.
+        :rtype: list of tuples
+        """
+        self.f.flush()
+        result = []
+        index = max(first, self.first)
+        last = min(last, self.written)
+        while index < last:
+            slot = index % self.capacity
+            n = min(last - index, self.capacity - slot)
+            self.f.seek(self.offset + slot * RECORD.size)
+            for values in RECORD.iter_unpack(self.f.read(n * RECORD.size)):
+                start, channel, count, vmin, vmax, mean, rms, ah, gap = values
+                s = Stats()
+                s.count = count
+                s.min = vmin
+                s.max = vmax
+                s.sum = mean * count
+                s.sumsq = rms * rms * count
+                s.ah = ah
+                s.gap = gap
+                result.append((index, start, channel, s))
+                index += 1
+        return result
+
+    def search(self, t):
+        """
+        Finds the first record with a bucket start of t or later by binary search.
+
+        :return: index of the record, written if there is none.
+        :rtype: int
+        """
+        self.f.flush()
+        lo, hi = self.first, self.written
+        while lo < hi:
+            mid = (lo + hi) // 2
+            self.f.seek(self.offset + (mid % self.capacity) * RECORD.size)
+            if RECORD.unpack(self.f.read(RECORD.size))[0] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, start = -math.inf, end = math.inf):
+        """
+        Reads the records of the buckets starting in a period, only the records of the period are read.
+
+        :param start: begin of the period as time.time() value, defaults to the oldest record.
+        :type start: float
+        :param end: end of the period as time.time() value, defaults to the newest record.
+        :type end: float
+        :return: bucket start, channel and statistics of each record, oldest first.
+        :rtype: generator of tuples
+        """
+        for index, t, channel, stats in self.read(self.search(start), self.search(end)):
+            if start <= t < end:
+                yield t, channel, stats
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class _Tier:
+    # open buckets of one tier, completed buckets are written and passed to the next tier. Each open bucket keeps
+    # the index of the first record of the finer tier merged into it, written as mark to rebuild it after a crash.
+    def __init__(self, period, tierfile, upper):
+        self.period = period
+        self.file = tierfile
+        self.upper = upper
+        self.lower = None
+        self.recovering = None
+        self.open = {}
+        self.start = -math.inf
+
+    def bucket(self, channel, t, index = 0):
+        start = math.floor(t / self.period) * self.period
+        if start > self.start:
+            # the buckets of all channels are closed together, so the records stay in the order of their start
+            # even if the channels are read at different rates
+            for ch in list(self.open):
+                self.close(ch, index)
+            self.start = start
+        current = self.open.get(channel)
+        if current is not None and current[0] != start:
+            self.close(channel, index)
+            current = None
+        if current is None:
+            current = (start, Stats(), index)
+            self.open[channel] = current
+        return current[1]
+
+    def close(self, channel, index = None):
+        start, stats, first = self.open.pop(channel)
+        written = self.lower.file.written if self.lower is not None else 0
+        marks = self.recovering if self.recovering is not None else [written] * self.file.channels
+        marks[channel] = written if index is None else index
+        for ch, current in self.open.items():
+            marks[ch] = current[2]
+        self.file.append(start, channel, stats, list(marks))
+        if self.upper is not None:
+            self.upper.bucket(channel, start, self.file.written - 1).merge(stats)
+
+    def recover(self):
+        # merges the records of the finer tier which were in open buckets at an unclean stop
+        self.recovering = list(self.file.marks)
+        for index, start, channel, stats in self.lower.file.read(min(self.recovering), self.lower.file.written):
+            if index >= self.recovering[channel]:
+                self.bucket(channel, start, index).merge(stats)
+        self.recovering = None
+
+
+class EnergyLog:
+    """
+    Aggregates readings per channel into the tiers of TIERS and answers queries over arbitrary periods.
+
+    Only complete buckets are written to the coarser tiers. Buckets still open when the log is closed, or at an unclean
+    stop, are rebuilt from the records of the finer tier when the log is opened again. An unclean stop loses the readings
+    of the last second only.
+
+    :param directory: directory of the tier files. It is created if needed.
+    :type directory: str
+    :param channels: number of channels 0 ... channels - 1, used to size the tier files, defaults to 4.
+    :type channels: int
+    :param tiers: bucket length and retention in [s] of each tier, finest first, defaults to TIERS.
+    :type tiers: tuple of tuples
+    :param period: expected time between the readings of a channel in [s], defaults to 1.0.
+    :type period: float
+    :param max_gap: longest time between two readings in [s] over which the charge is integrated, defaults to GAP
+        periods. Longer gaps are summed up in Stats.gap instead.
+    :type max_gap: float
+    :param verbose: prints the gaps found, defaults to False.
+    :type verbose: boolean
+    """
+    def __init__(self, directory, channels = 4, tiers = TIERS, period = 1.0, max_gap = None, verbose = False):
+        os.makedirs(directory, exist_ok=True)
+        self.channels = channels
+        self.max_gap = GAP * period if max_gap is None else max_gap
+        self.verbose = verbose
+        self.tiers = []
+        upper = None
+        for length, retention in reversed(tiers):
+            path = os.path.join(directory, "energy_%ds.dat" % length)
+            upper = _Tier(length, TierFile(path, channels * retention // length, channels), upper)
+            if self.tiers:
+                self.tiers[0].lower = upper
+            self.tiers.insert(0, upper)
+        for tier in reversed(self.tiers[1:]):
+            tier.recover()
+        self.last = {}
+
+    def add(self, channel, value, t = None):
+        """
+        Adds a reading of a channel. The charge is integrated from the previous reading of the same channel.
+
+        :param channel: the channel, for example the power output 0 ... 3.
+        :type channel: int
+        :param value: the reading in [A].
+        :type value: float
+        :param t: time of the reading as returned by time.time(), defaults to now.
+        :type t: float
+        :raises ValueError: if the channel is out of range.
+        """
+        if not 0 <= channel < self.channels:
+            raise ValueError("channel %d is not in 0 ... %d" % (channel, self.channels - 1))
+        if t is None:
+            t = time.time()
+        ah = 0.0
+        gap = 0.0
+        previous = self.last.get(channel)
+        if previous is not None and t > previous[0]:
+            if t - previous[0] <= self.max_gap:
+                ah = (previous[1] + value) / 2.0 * (t - previous[0]) / 3600.0
+            else:
+                gap = t - previous[0]
+                if self.verbose:
+                    print("energy: channel %d not integrated over a gap of %.1f s" % (channel, gap))
+        self.last[channel] = (t, value)
+        self.tiers[0].bucket(channel, t).add(value, ah, gap)
+        return self
+
+    def add_sweep(self, result, t = None):
+        """
+        Adds the currents of a TPS2H.sweep() result, one channel per output.
+
+        :param result: current and temperature with their resolution of each output.
+        :type result: list of tps2h.Reading
+        :param t: time of the sweep as returned by time.time(), defaults to now.
+        :type t: float
+        """
+        if t is None:
+            t = time.time()
+        for channel, (current, resolution, temperature, temperature_resolution) in enumerate(result):
+            self.add(channel, current, t)
+        return self
+
+    def flush(self):
+        """
+        Writes the open one second buckets and flushes the files. Use before power down. The coarser buckets are only
+        written when they are complete, when the log is opened again they are rebuilt from the finer tiers.
+        """
+        for channel in list(self.tiers[0].open):
+            self.tiers[0].close(channel)
+        for tier in self.tiers:
+            tier.file.flush()
+        return self
+
+    def close(self):
+        self.flush()
+        for tier in self.tiers:
+            tier.file.close()
+
+    def summary(self, channel, start, end):
+        """
+        Statistics of a channel over a period from the written buckets. Each part of the period is taken from the
+        coarsest tier whose buckets fit in completely. Buckets missing in a tier are taken from the finer tier.
+
+        :param channel: the channel.
+        :type channel: int
+        :param start: begin of the period as time.time() value.
+        :type start: float
+        :param end: end of the period as time.time() value.
+        :type end: float
+        :return: combined statistics of the period.
+        :rtype: Stats
+        """
+        result = Stats()
+        self._collect(channel, start, end, len(self.tiers) - 1, result)
+        return result
+
+    def amp_hours(self, channel, start, end):
+        """
+        Charge drawn by a channel over a period in [Ah].
+        """
+        return self.summary(channel, start, end).ah
+
+    def _collect(self, channel, start, end, level, result):
+        # merges the aligned part of the period from the tier of this level and the rest from the finer tiers
+        if start >= end:
+            return
+        tier = self.tiers[level]
+        if level == 0:
+            for t, ch, stats in tier.file.records(start, end):
+                if ch == channel:
+                    result.merge(stats)
+            return
+        lo = math.ceil(start / tier.period) * tier.period
+        hi = math.floor(end / tier.period) * tier.period
+        if lo >= hi:
+            self._collect(channel, start, end, level - 1, result)
+            return
+        self._collect(channel, start, lo, level - 1, result)
+        covered = lo
+        for t, ch, stats in tier.file.records(lo, hi):
+            if ch == channel:
+                self._collect(channel, covered, t, level - 1, result)
+                result.merge(stats)
+                covered = max(covered, t + tier.period)
+        self._collect(channel, covered, end, level - 1, result)
+
+
+if __name__ == '__main__':
+
+    from . import board, tps2h
+
+    profile = board.load()
+    ads = tps2h.ads1119.ADS1119(profile.bus, profile.address("ads1119"))
+    gpio = tps2h.mcp23017.MCP23017(profile.bus, profile.address("mcp23017"))
+    ads.reset()
+    ads.continous = 1
+    ads.configure()
+    ads.start()
+    sw = tps2h.TPS2H(gpio, ads)
+    sw.setup()
+
+    log = EnergyLog("energy")
+    now = time.time()
+    for k in range(10):
+        log.add_sweep(sw.sweep())
+    log.flush()
+    for channel in range(tps2h.MAX_CHANNEL + 1):
+        print(channel, log.summary(channel, now, time.time()))
+    log.close()
@@ -0,0 +1,219 @@
+"""
+This module creates a base class for I2C devices with easy access methods.
+Derived classes for specific I2C devices inherit the base methods and can focus on the specific features.
+The module makes use of smbus.py, however this would be the right spot to use a different access library if needed.
+
+All transactions go through a common error policy: NACK and arbitration errors are retried with an increasing delay,
+the bus handle is reopened after EREMOTEIO or ETIMEDOUT and every call is bounded by a deadline. Failures are reported
+as I2CError or I2CTimeout, both derived from OSError.
+
+For asyncio applications each bus gets a single worker thread. All transactions of devices on the same bus are
+queued there, devices on different buses run in parallel without blocking the event loop. asyncio and the executor
+are imported on first use only, they would add a noticeable delay to the start of one-shot commands.
+"""
+
+import errno
+import threading
+import time
+
+import smbus
+
+# default error policy of a device
+RETRIES = 3             # additional attempts after a failed transaction
+BACKOFF = 0.002         # delay before the first retry in s, doubled for each further retry
+TIMEOUT = 0.1           # deadline of a single read or write call in s
+
+# errors worth another try: missing acknowledge or lost arbitration
+RETRY_ERRNOS  = (errno.EIO, errno.ENXIO, errno.EAGAIN)
+# errors after which the bus handle is reopened before the next try
+REOPEN_ERRNOS = (errno.EREMOTEIO, errno.ETIMEDOUT)
+
+
+class I2CError(OSError):
+    """
+    Raised if a transaction with the device fails permanently or after all retries.
+    """
+
+
+class I2CTimeout(I2CError):
+    """
+    Raised if a call could not be completed before its deadline, for example a device not getting ready in time.
+    """
+
+
+# one single threaded executor per I2C bus, shared by all devices on that bus
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def bus_key(bus):
+    """
+    Normalizes the name of an I2C bus, 1, "1", "i2c-1" and "/dev/i2c-1" are the same bus.
+
+    :param bus: the I2C bus. For example 1 or i2c-1
+    :type bus: int or str
+    :return: the number of the bus, or the name if it has no number.
+    :rtype: int or str
+    """
+    name = str(bus).rsplit("/", 1)[-1]
+    if name.startswith("i2c-"):
+        name = name[4:]
+    try:
+        return int(name)
+    except ValueError:
+        return name
+
+
+def bus_executor(bus):
+    """
+    Returns the executor which serializes all transactions of one I2C bus. It is created on first use.
+
+    :param bus: the I2C bus. For example 1 or i2c-1
+    :type bus: int or str
+    :return: executor with a single worker thread for this bus.
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    import concurrent.futures
+    key = bus_key(bus)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="i2c-%s" % key)
+            _executors[key] = executor
+    return executor
+
+
+class i2c_device:
+    """
+    This is the base class of I2C devices. It holds its information about I2C bus and device address and provdes simple read an write access for child classes.
+
+    :param bus: the I2C bus of the connected device. For example 1 or i2c-1
+    :type bus: int or str
+    :param addr: address of the device. Like 0x20 for a port extender
+    :type addr: int in the range of 0x08 ... 0x77
+    :param verbose: setting for printing verbosity information to the console, defaults to False.
+    :type verbose: boolean
+    :param retries: number of additional attempts after a failed transaction, defaults to RETRIES.
+    :type retries: int
+    :param timeout: deadline of a single read or write call in [s], defaults to TIMEOUT.
+    :type timeout: float
+    """
+    def __init__(self, bus, addr, verbose = False, retries = RETRIES, timeout = TIMEOUT):
+        self.bus  = smbus.SMBus(bus)
+        self.bus_number = bus
+        self.addr = addr
+        self.verbose = verbose
+        self.retries = retries
+        self.timeout = timeout
+        
+        # set up different I2C implementations here
+
+    def reopen(self):
+        """
+        Closes and reopens the handle of the I2C bus, used to recover from bus errors.
+
+        :raises I2CError: if the bus cannot be opened again.
+        """
+        if self.verbose:
+            print("i2c_device reopen bus: ", self.bus_number)
+        try:
+            self.bus.close()
+        except OSError:
+            pass
+        try:
+            self.bus = smbus.SMBus(self.bus_number)
+        except OSError as e:
+            raise I2CError(e.errno, "I2C bus %s cannot be opened: %s" % (self.bus_number, e.strerror)) from e
+        return self
+
+    def _transfer(self, name, register, arg, timeout):
+        # runs one smbus call under the error policy of the device
+        if timeout is None:
+            timeout = self.timeout
+        if timeout <= 0:
+            raise I2CTimeout(errno.ETIMEDOUT, "I2C transfer to 0x%02x has no time left" % (self.addr))
+        deadline = time.monotonic() + timeout
+        delay = BACKOFF
+        for attempt in range(self.retries + 1):
+            try:
+                return getattr(self.bus, name)(self.addr, register, arg)
+            except OSError as e:
+                error = e
+                if self.verbose:
+                    print("i2c_device error: addr, register, errno: ", self.addr, register, e.errno)
+                if e.errno in REOPEN_ERRNOS:
+                    self.reopen()
+                elif e.errno not in RETRY_ERRNOS:
+                    raise I2CError(e.errno, "I2C transfer to 0x%02x failed: %s" % (self.addr, e.strerror)) from e
+            if attempt == self.retries:
+                break
+            if time.monotonic() + delay > deadline:
+                raise I2CTimeout(errno.ETIMEDOUT, "I2C transfer to 0x%02x exceeded its deadline" % (self.addr)) from error
+            time.sleep(delay)
+            delay = 2 * delay
+        raise I2CError(error.errno, "I2C transfer to 0x%02x failed after %d tries: %s" % (self.addr, self.retries + 1, error.strerror)) from error
+        
+    def write(self, register, data, timeout = None):
+        """
+        writes a one byte register followed by zero or more bytes of data to the device.
+        
+        :param register: device register to write the data
+        :type register: one byte integer
+        :param data: data to be written after specific register
+        :type data: array of single byte integers
+        :param timeout: deadline of the call in [s], defaults to the timeout of the device.
+        :type timeout: float
+        :return: returns a success value.
+        :rtype: int
+        :raises I2CError: if the transaction fails after all retries.
+        """
+        if self.verbose:
+            print("i2c_device write: register, data: ", register, data)
+
+        assert register >= 0x00 and register <= 0xff, "register is only 8 bits wide."
+        ret = self._transfer("write_i2c_block_data", register, data, timeout)
+        return ret
+    
+    def read(self, register, lenght, timeout = None):
+        """
+        reads one or more bytes from a certain register.
+        
+        :param register: device register to read from
+        :type register: one byte integer
+        :param lenght: number of bytes to be read
+        :type lenght: one byte integer
+        :param timeout: deadline of the call in [s], defaults to the timeout of the device.
+        :type timeout: float
+        :return: returns a block of data
+        :rtype: array of int
+        :raises I2CError: if the transaction fails after all retries.
+        """
+        assert register >= 0x00 and register <= 0xff, "register is only 8 bits wide."
+        blk = self._transfer("read_i2c_block_data", register, lenght, timeout)
+        if self.verbose:
+            print("i2c_device read: register, data: ", register, blk)
+        return blk
+
+    async def run_async(self, func, *args):
+        """
+        Runs a blocking function on the executor of the device's bus and waits for it without blocking the event loop.
+
+        :param func: function doing the bus transactions, typically a method of the device.
+        :type func: callable
+        :return: the return value of func.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(bus_executor(self.bus_number), func, *args)
+
+    async def write_async(self, register, data, timeout = None):
+        """
+        asyncio counterpart of write().
+        """
+        return await self.run_async(self.write, register, data, timeout)
+
+    async def read_async(self, register, lenght, timeout = None):
+        """
+        asyncio counterpart of read().
+        """
+        return await self.run_async(self.read, register, lenght, timeout)
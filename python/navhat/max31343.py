@@ -7,7 +7,7 @@ Christian Schilling     September 2024
 
 
 import time
-import i2c_device
+from . import i2c_device
 
 #Registers of MAX31343 datasheet section register map
 MAX31343_STATUS         = 0x00
@@ -19,6 +19,9 @@ MAX31343_ALARM2         = 0x13
 MAX31343_TRICKLE        = 0x19
 MAX31343_TEMPERATURE    = 0x1a
 
+# settling time between writing alarm2 and enabling its interrupt
+ALARM_DELAY             = 0.05
+
 #Flags
 INTERRUPT_ALARM1        = 0x01
 INTERRUPT_ALARM2        = 0x02
@@ -48,9 +51,13 @@ class MAX31343(i2c_device.i2c_device):
     :type addr: int in the range of 0x08 ... 0x77
     :param verbose: setting for printing verbosity information to the console, defaults to False.
     :type verbose: boolean
+    :param retries: number of additional attempts after a failed I2C transaction, defaults to i2c_device.RETRIES.
+    :type retries: int
+    :param timeout: deadline of a single I2C call in [s], defaults to i2c_device.TIMEOUT.
+    :type timeout: float
     """
-    def __init__(self, bus_number, i2c_addr, verbose = False):
-        super().__init__(bus_number, i2c_addr, verbose)
+    def __init__(self, bus_number, i2c_addr, verbose = False, retries = i2c_device.RETRIES, timeout = i2c_device.TIMEOUT):
+        super().__init__(bus_number, i2c_addr, verbose, retries, timeout)
         self.verbose = verbose
  
     def reset(self):
@@ -112,6 +119,12 @@ class MAX31343(i2c_device.i2c_device):
         :param min: the min after the set hour in the range 0 - 59.
         :type hour: int
         """
+        self._write_alarm2(hour, min)
+        #enable interrupt alarm2
+        time.sleep(ALARM_DELAY)
+        self._enable_alarm2()
+
+    def _write_alarm2(self, hour, min):
         #disable interrupt alarm2
         ie = self.read(MAX31343_INT_ENABLE, 1)[0] & ~INTERRUPT_ALARM2
         self.write(MAX31343_INT_ENABLE, [ie])
@@ -120,8 +133,8 @@ class MAX31343(i2c_device.i2c_device):
         d[1] = _bin2bcd(hour)
         d[2] = 0x80 # once every day
         self.write(MAX31343_ALARM2, d)
-        #enable interrupt alarm2
-        time.sleep(.05)
+
+    def _enable_alarm2(self):
         ie = self.read(MAX31343_INT_ENABLE, 1)[0] | INTERRUPT_ALARM2
         self.write(MAX31343_INT_ENABLE, [ie])
 
@@ -152,6 +165,39 @@ class MAX31343(i2c_device.i2c_device):
         self.temp = ((reg[0] <<8) + reg[1]) / 256.0
         #print("Temperature: %02x %02x -> %3.2f °C" % (reg[0], reg[1], self.temp))
         return self.temp
+
+    # asyncio counterparts, bus transactions run on the executor of the I2C bus
+    async def reset_async(self):
+        return await self.run_async(self.reset)
+
+    async def get_status_async(self):
+        return await self.run_async(self.get_status)
+
+    async def set_time_async(self):
+        return await self.run_async(self.set_time)
+
+    async def get_time_async(self):
+        return await self.run_async(self.get_time)
+
+    async def set_alarm2_async(self, hour=8, min=0):
+        """
+        asyncio counterpart of set_alarm2(). The settling time before enabling the interrupt does not block the event loop.
+        
+        :param hour: the hour of the day in the range 0 - 23.
+        :type hour: int
+        :param min: the min after the set hour in the range 0 - 59.
+        :type hour: int
+        """
+        import asyncio
+        await self.run_async(self._write_alarm2, hour, min)
+        await asyncio.sleep(ALARM_DELAY)
+        await self.run_async(self._enable_alarm2)
+
+    async def set_trickle_charger_async(self, enable = True, setting = 0x05):
+        return await self.run_async(self.set_trickle_charger, enable, setting)
+
+    async def temperature_async(self):
+        return await self.run_async(self.temperature)
     
 
     def Diag(self):
@@ -175,9 +221,9 @@ class MAX31343(i2c_device.i2c_device):
 if __name__ == '__main__':
     
 
-    SMBUS_NUMBER = 1
-    addr = 0x68
-    rtc=MAX31343(SMBUS_NUMBER, addr)
+    from . import board
+    profile = board.load()
+    rtc=MAX31343(profile.bus, profile.address("max31343"))
     rtc.set_time()
     time.sleep(0.5)
     rtc.set_trickle_charger()
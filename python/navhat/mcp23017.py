@@ -6,7 +6,7 @@ Christian Schilling     November 2024
 """
 
 import time
-import i2c_device
+from . import i2c_device
 
 #Registers of MCP23017 datasheet section register map
 MCP23017_IODIRA         = 0x00
@@ -32,9 +32,13 @@ class MCP23017(i2c_device.i2c_device):
     :type addr: int in the range of 0x08 ... 0x7f
     :param self.verbose: setting for printing verbosity information to the console, defaults to False.
     :type verbose: boolean
+    :param retries: number of additional attempts after a failed I2C transaction, defaults to i2c_device.RETRIES.
+    :type retries: int
+    :param timeout: deadline of a single I2C call in [s], defaults to i2c_device.TIMEOUT.
+    :type timeout: float
     """
-    def __init__(self, bus, addr, verbose = False):
-        super().__init__(bus, addr, verbose)
+    def __init__(self, bus, addr, verbose = False, retries = i2c_device.RETRIES, timeout = i2c_device.TIMEOUT):
+        super().__init__(bus, addr, verbose, retries, timeout)
         self.verbose = verbose
 
     def set_io_direction(self, port, direction):
@@ -105,13 +109,29 @@ class MCP23017(i2c_device.i2c_device):
         self.write(port + MCP23017_PULL_UP_A, [pattern])
         return self
 
+    # asyncio counterparts, bus transactions run on the executor of the I2C bus
+    async def set_io_direction_async(self, port, direction):
+        return await self.run_async(self.set_io_direction, port, direction)
+
+    async def get_io_direction_async(self, port):
+        return await self.run_async(self.get_io_direction, port)
+
+    async def set_io_output_async(self, port, pattern):
+        return await self.run_async(self.set_io_output, port, pattern)
+
+    async def get_io_pin_async(self, port):
+        return await self.run_async(self.get_io_pin, port)
+
+    async def set_pull_up_async(self, port, pattern):
+        return await self.run_async(self.set_pull_up, port, pattern)
+
 
 if __name__ == '__main__':
     
     # small demo to test functionality
-    SMBUS_NUMBER = 1
-    addr = 0x22
-    iod=MCP23017(SMBUS_NUMBER, addr)
+    from . import board
+    profile = board.load()
+    iod=MCP23017(profile.bus, profile.address("mcp23017"))
 
     time.sleep(0.5)
     iod.set_io_direction(PORT_A, 0x00)
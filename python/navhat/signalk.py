@@ -0,0 +1,290 @@
+"""
+Publishes the readings of the Navigation HAT as Signal K delta messages.
+
+Readings are passed to update() whenever they are taken. flush() collects the values which are due into one delta
+message and sends it. A value is due if its minimum period has passed since it was sent last and it differs from the
+sent value by more than its deadband. Newer readings of the same path replace older ones, so a path is sent at most
+once per message. Unchanged values are not resent.
+
+Values are in SI units as required by Signal K: currents in A, temperatures in K, pressure in Pa and voltages in V.
+The messages are sent as lines of JSON over TCP, or over a WebSocket using the optional websockets package.
+
+The command navhat signalk runs the publisher. Run this module to get a stand-in server which prints the messages it
+receives.
+
+Christian Schilling     October 2026
+"""
+
+import json
+import socket
+import time
+
+# Signal K path of each kind of reading, %d is the channel
+PATHS = {
+    "state":       "electrical.switches.navhat.%d.state",
+    "current":     "electrical.switches.navhat.%d.current",
+    "temperature": "electrical.switches.navhat.%d.temperature",
+    "rtc":         "environment.inside.navhat.temperature",
+    "pressure":    "environment.outside.pressure",
+    "adc":         "electrical.navhat.adc.%d.voltage",
+}
+
+# minimum period in s and deadband of each kind of reading
+RULES = {
+    "state":       (0.0, 0.0),
+    "current":     (1.0, 0.05),
+    "temperature": (10.0, 0.5),
+    "rtc":         (60.0, 0.25),
+    "pressure":    (10.0, 10.0),
+    "adc":         (1.0, 0.005),
+}
+
+SOURCE = "navhat"
+KELVIN = 273.15
+
+# port of the Signal K TCP interface
+PORT = 8375
+
+# period of the readings in s, a sweep of the outputs with auto-ranging takes about 1.3 s
+PERIOD = 2.0
+
+
+class TcpStream:
+    """
+    Sends messages as lines over TCP. The connection is opened on first use and again after an error.
+
+    :param host: host name of the Signal K server, defaults to localhost.
+    :type host: str
+    :param port: TCP port of the server, defaults to PORT.
+    :type port: int
+    :param timeout: timeout of connecting and sending in [s], defaults to 1.0.
+    :type timeout: float
+    """
+    def __init__(self, host = "localhost", port = PORT, timeout = 1.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.sock = None
+
+    def send(self, message):
+        """
+        Sends one message.
+
+        :param message: serialized delta message.
+        :type message: str
+        :raises OSError: if the server cannot be reached, the connection is opened again on the next call.
+        """
+        try:
+            if self.sock is None:
+                self.sock = socket.create_connection(self.address, self.timeout)
+            self.sock.sendall(message.encode() + b"\r\n")
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class WebSocketStream:
+    """
+    Sends messages over the Signal K WebSocket stream, for example ws://localhost:3000/signalk/v1/stream?subscribe=none.
+    Needs the websockets package.
+
+    :param url: URL of the stream.
+    :type url: str
+    """
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+
+    def send(self, message):
+        from websockets.sync.client import connect
+        try:
+            if self.ws is None:
+                self.ws = connect(self.url)
+            self.ws.send(message)
+        except Exception as e:
+            self.close()
+            raise OSError("WebSocket %s: %s" % (self.url, e)) from e
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
+
+
+class Publisher:
+    """
+    Coalesces readings and sends the changed ones as Signal K delta messages.
+
+    :param stream: transport of the messages with a send(message) method, like TcpStream.
+    :type stream: TcpStream or WebSocketStream
+    :param rules: minimum period and deadband by kind of reading, defaults to RULES.
+    :type rules: dict
+    :param source: label of the source in the messages, defaults to SOURCE.
+    :type source: str
+    """
+    def __init__(self, stream, rules = RULES, source = SOURCE):
+        self.stream = stream
+        self.rules = dict(rules)
+        self.source = {"label": source}
+        self.latest = {}
+        self.sent = {}
+        self.kinds = {}
+
+    def update(self, path, value, kind = None):
+        """
+        Stores a reading for the next message. Older readings of the same path not sent yet are replaced.
+
+        :param path: Signal K path of the value.
+        :type path: str
+        :param value: the value in SI units.
+        :type value: float, boolean or str
+        :param kind: kind of the reading to select its rule, a key of RULES. Without it, every change is sent.
+        :type kind: str
+        """
+        self.latest[path] = value
+        if kind is not None:
+            self.kinds[path] = kind
+        return self
+
+    def _due(self, path, value, now):
+        if path not in self.sent:
+            return True
+        sent_value, sent_time = self.sent[path]
+        min_period, deadband = self.rules.get(self.kinds.get(path), (0.0, 0.0))
+        if now - sent_time < min_period:
+            return False
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(sent_value, (int, float)):
+            return abs(value - sent_value) > deadband
+        return value != sent_value
+
+    def flush(self, now = None):
+        """
+        Sends the values which are due in one delta message.
+
+        :param now: current time as returned by time.time(), defaults to now.
+        :type now: float
+        :return: number of values sent.
+        :rtype: int
+        :raises OSError: if the message cannot be sent, the values are sent again with the next flush().
+        """
+        if now is None:
+            now = time.time()
+        values = [(path, value) for path, value in self.latest.items() if self._due(path, value, now)]
+        if not values:
+            return 0
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now)) + ".%03dZ" % (int(now * 1000) % 1000)
+        delta = {"updates": [{"source": self.source, "timestamp": timestamp,
+                              "values": [{"path": path, "value": value} for path, value in values]}]}
+        self.stream.send(json.dumps(delta, separators=(",", ":")))
+        for path, value in values:
+            self.sent[path] = (value, now)
+        return len(values)
+
+    def add_outputs(self, channel, result = None):
+        """
+        Adds the state of the power outputs and optionally a TPS2H.sweep() result.
+
+        :param channel: bit pattern of the outputs as held by TPS2H.channel.
+        :type channel: int
+        :param result: current in [A] and temperature in [°C] with their resolution of each output.
+        :type result: list of tps2h.Reading
+        """
+        for k in range(4):
+            self.update(PATHS["state"] % k, bool(channel & (1 << k)), "state")
+        for k, (current, resolution, temperature, temperature_resolution) in enumerate(result or []):
+            self.update(PATHS["current"] % k, current, "current")
+            self.update(PATHS["temperature"] % k, temperature + KELVIN, "temperature")
+        return self
+
+    def add_rtc(self, temperature):
+        """
+        Adds the temperature of the RTC in [°C].
+        """
+        return self.update(PATHS["rtc"], temperature + KELVIN, "rtc")
+
+    def add_pressure(self, pressure):
+        """
+        Adds the barometric pressure in [Pa].
+        """
+        return self.update(PATHS["pressure"], pressure, "pressure")
+
+    def add_adc(self, channel, voltage):
+        """
+        Adds the voltage of an ADC channel in [V].
+        """
+        return self.update(PATHS["adc"] % channel, voltage, "adc")
+
+
+def run(publisher, sw = None, rtc = None, period = PERIOD):
+    """
+    Publishes the outputs and the RTC temperature until interrupted. Messages which cannot be sent are retried in the next period.
+    Readings which fail are skipped for the period. If the readings take longer than the period, a warning is printed
+    once and the next period starts right away. A sweep of the outputs takes about 8 times the settling time of
+    tps2h.DIAG_SETTLE plus one conversion of the ADC.
+
+    :param publisher: the publisher.
+    :type publisher: Publisher
+    :param sw: the switches, their state is read and they are swept each period if given.
+    :type sw: tps2h.TPS2H
+    :param rtc: the RTC for its temperature.
+    :type rtc: max31343.MAX31343
+    :param period: period of the readings in [s], defaults to PERIOD.
+    :type period: float
+    """
+    from . import mcp23017, tps2h
+    warned = False
+    while True:
+        start = time.monotonic()
+        if sw is not None:
+            try:
+                # the outputs may have been switched by another process, for example navhat on
+                sw.channel = sw.io.get_io_pin(mcp23017.PORT_B) & tps2h.OUTPUT_MASK
+                publisher.add_outputs(sw.channel, sw.sweep())
+            except OSError as e:
+                print("signalk: outputs not read: %s" % e)
+        if rtc is not None:
+            try:
+                publisher.add_rtc(rtc.temperature())
+            except OSError as e:
+                print("signalk: RTC not read: %s" % e)
+        elapsed = time.monotonic() - start
+        if elapsed > period and not warned:
+            print("signalk: the readings take %.2f s, longer than the period of %.2f s" % (elapsed, period))
+            warned = True
+        try:
+            publisher.flush()
+        except OSError as e:
+            print("signalk: %s" % e)
+        time.sleep(max(0.0, period - (time.monotonic() - start)))
+
+
+def serve(port = PORT):
+    """
+    Stand-in for a Signal K server, prints each message received over TCP.
+
+    :param port: TCP port to listen on, defaults to PORT.
+    :type port: int
+    """
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                print(line.decode().strip())
+
+    with socketserver.ThreadingTCPServer(("localhost", port), Handler) as server:
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='stand-in Signal K server, prints the delta messages of navhat signalk')
+    parser.add_argument("--port", help="TCP port to listen on", type=int, default=PORT)
+    args = parser.parse_args()
+    serve(args.port)
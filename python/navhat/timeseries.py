@@ -0,0 +1,267 @@
+"""
+Memory mapped time series of sensor readings, one file per signal.
+
+Each file holds a header and a ring of fixed size records. The first field of a record is the time stamp in seconds
+as returned by time.time(), followed by the fields of the schema. A writer appends records directly into the mapped
+memory, there is no system call per sample. Other processes map the same file read only and get the records as NumPy
+arrays without copying, for example the pressure trend of the last 24 hours by window(time.time() - 86400).
+
+The header holds two counters: the number of records written and the number of records covered by the last checkpoint.
+checkpoint() flushes the records to the storage before it updates the second counter. When a store is reopened for
+writing, the records written after the last checkpoint are kept as long as their time stamps increase, the others are
+dropped. The slots of dropped records get the time stamp 0 and are skipped by the readers. This keeps the file
+consistent after a crash or a power loss.
+
+NumPy is only needed to read the records as arrays, writing works without it.
+
+Christian Schilling     October 2026
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+
+# header: magic, version, record size, capacity, records written, records checkpointed, schema
+HEADER = struct.Struct("<4sHHI4xQQ96s")
+SCHEMA_SIZE = 96
+MAGIC = b"NHTS"
+VERSION = 1
+WRITTEN_OFFSET = 16
+COMMITTED_OFFSET = 24
+COUNTER = struct.Struct("<Q")
+
+# default schema: one reading stored as 32 bit float
+FIELDS = (("value", "f"),)
+
+# NumPy type of each supported struct format character, with the standard sizes of struct
+DTYPES = {
+    "b": "i1", "B": "u1", "?": "?",
+    "h": "<i2", "H": "<u2",
+    "i": "<i4", "I": "<u4", "l": "<i4", "L": "<u4",
+    "q": "<i8", "Q": "<u8",
+    "e": "<f2", "f": "<f4", "d": "<f8",
+}
+
+# default capacity, one week at one sample per second
+CAPACITY = 7 * 24 * 3600
+
+
+def _schema(fields):
+    # struct format and schema string of the record, the time stamp is always the first field
+    for name, f in fields:
+        if f not in DTYPES:
+            raise ValueError("format %r of field %s is not one of %s" % (f, name, "".join(DTYPES)))
+        if not name or ":" in name or "," in name:
+            raise ValueError("field name %r must not be empty or contain ':' or ','" % (name))
+    fmt = "<d" + "".join(f for name, f in fields)
+    text = ",".join("%s:%s" % (name, f) for name, f in fields)
+    if len(text.encode()) > SCHEMA_SIZE:
+        raise ValueError("schema %s is longer than %d bytes" % (text, SCHEMA_SIZE))
+    return fmt, text
+
+
+class TimeSeries:
+    """
+    Ring store of one signal in a memory mapped file. The file is created if it does not exist.
+
+    :param path: file name of the store.
+    :type path: str
+    :param fields: name and struct format character of each field after the time stamp, a key of DTYPES, defaults to FIELDS. Ignored if the file exists.
+    :type fields: tuple of tuples
+    :param capacity: number of records held in the ring, defaults to CAPACITY. Ignored if the file exists.
+    :type capacity: int
+    :param readonly: maps the file read only, for readers in other processes. Defaults to False.
+    :type readonly: boolean
+    :raises ValueError: if a format is not supported, a name contains ':' or ',' or the schema as "name:f,..." does
+        not fit into SCHEMA_SIZE bytes.
+    """
+    def __init__(self, path, fields = FIELDS, capacity = CAPACITY, readonly = False):
+        self.path = path
+        self.readonly = readonly
+        if readonly or os.path.exists(path):
+            self.f = open(path, "rb" if readonly else "r+b")
+            magic, version, size, capacity, self.written, committed, text = HEADER.unpack(self.f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("%s is not a time series file of version %d" % (path, VERSION))
+            text = text.rstrip(b"\0").decode()
+            fields = tuple(tuple(item.split(":")) for item in text.split(",")) if text else ()
+        else:
+            fmt, text = _schema(fields)
+            self.f = open(path, "w+b")
+            self.f.truncate(HEADER.size + capacity * struct.calcsize(fmt))
+            self.f.write(HEADER.pack(MAGIC, VERSION, struct.calcsize(fmt), capacity, 0, 0, text.encode()))
+            self.f.flush()
+            self.written = committed = 0
+        self.fields = fields
+        self.capacity = capacity
+        self.record = struct.Struct(_schema(fields)[0])
+        if readonly:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.mm = mmap.mmap(self.f.fileno(), 0)
+            self._resume(committed)
+
+    def _time(self, index):
+        return struct.unpack_from("<d", self.mm, HEADER.size + (index % self.capacity) * self.record.size)[0]
+
+    def _resume(self, committed):
+        # keeps the records after the checkpoint while their time stamps increase and the one before is still held
+        resume = committed
+        previous = self._time(committed - 1) if committed > 0 else 0.0
+        while resume < self.written and resume > self.written - self.capacity:
+            t = self._time(resume)
+            if not previous <= t < math.inf:
+                break
+            previous = t
+            resume += 1
+        for index in range(resume, min(self.written, resume + self.capacity)):
+            struct.pack_into("<d", self.mm, HEADER.size + (index % self.capacity) * self.record.size, 0.0)
+        self.written = resume
+        COUNTER.pack_into(self.mm, WRITTEN_OFFSET, resume)
+
+    def append(self, *values, t = None):
+        """
+        Appends one record. The oldest record is overwritten if the ring is full.
+
+        :param values: the values of the fields in the order of the schema.
+        :type values: numbers
+        :param t: time stamp of the record as returned by time.time(), defaults to now.
+        :type t: float
+        """
+        if t is None:
+            t = time.time()
+        self.record.pack_into(self.mm, HEADER.size + (self.written % self.capacity) * self.record.size, t, *values)
+        self.written += 1
+        COUNTER.pack_into(self.mm, WRITTEN_OFFSET, self.written)
+        return self
+
+    def checkpoint(self):
+        """
+        Flushes all records to the storage and marks them as durable. Call it periodically and before sleep or power off.
+        """
+        self.mm.flush()
+        COUNTER.pack_into(self.mm, COMMITTED_OFFSET, self.written)
+        self.mm.flush(0, min(mmap.PAGESIZE, len(self.mm)))
+        return self
+
+    def close(self):
+        """
+        Checkpoints and closes the store. Arrays returned by the readers stay valid, the file is unmapped when the
+        last of them is released.
+        """
+        if not self.readonly:
+            self.checkpoint()
+        try:
+            self.mm.close()
+        except BufferError:
+            pass
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return min(self.count(), self.capacity)
+
+    def count(self):
+        """
+        :return: number of records ever written, as seen by the header.
+        :rtype: int
+        """
+        return COUNTER.unpack_from(self.mm, WRITTEN_OFFSET)[0]
+
+    def dtype(self):
+        """
+        :return: NumPy data type of a record, with the time stamp as field "t".
+        :rtype: numpy.dtype
+        """
+        import numpy
+        return numpy.dtype([("t", "<d")] + [(name, DTYPES[f]) for name, f in self.fields])
+
+    def view(self):
+        """
+        The whole ring as NumPy array, without copying. The records are in storage order, not in time order.
+
+        :return: all slots of the ring, including unused ones.
+        :rtype: numpy.ndarray
+        """
+        import numpy
+        return numpy.frombuffer(self.mm, self.dtype(), count=self.capacity, offset=HEADER.size)
+
+    def segments(self):
+        """
+        The valid records in time order as one or two NumPy arrays, without copying.
+
+        :return: older and newer part of the ring. The first part is empty if the ring has not wrapped yet.
+        :rtype: tuple of numpy.ndarray
+        """
+        import numpy
+        ring = self.view()
+        written = self.count()
+        if written <= self.capacity:
+            return ring[:0], ring[:written]
+        split = written % self.capacity
+        older, newer = ring[split:], ring[:split]
+        # slots dropped at a reopen have the time stamp 0 and precede the valid records
+        skip = numpy.searchsorted(older["t"], 0.0, side="right")
+        if skip == len(older):
+            newer = newer[numpy.searchsorted(newer["t"], 0.0, side="right"):]
+        return older[skip:], newer
+
+    def window(self, start, end = None):
+        """
+        The records between two points in time. It is a view into the store unless the period spans the wrap around
+        of the ring, then the two parts are joined into a copy.
+
+        :param start: begin of the period as time.time() value.
+        :type start: float
+        :param end: end of the period as time.time() value, defaults to the newest record.
+        :type end: float
+        :return: records with start <= t < end.
+        :rtype: numpy.ndarray
+        """
+        import numpy
+        parts = []
+        for part in self.segments():
+            lo = numpy.searchsorted(part["t"], start, side="left")
+            hi = len(part) if end is None else numpy.searchsorted(part["t"], end, side="left")
+            if hi > lo:
+                parts.append(part[lo:hi])
+        if not parts:
+            return self.view()[:0]
+        if len(parts) == 1:
+            return parts[0]
+        return numpy.concatenate(parts)
+
+    def last(self, n):
+        """
+        The newest n records in time order, see window() for copying.
+
+        :param n: number of records.
+        :type n: int
+        :return: the newest records.
+        :rtype: numpy.ndarray
+        """
+        import numpy
+        older, newer = self.segments()
+        if n <= len(newer):
+            return newer[len(newer) - n:]
+        return numpy.concatenate((older[max(0, len(older) - (n - len(newer))):], newer))
+
+
+if __name__ == '__main__':
+
+    from . import board, max31343
+
+    profile = board.load()
+    rtc = max31343.MAX31343(profile.bus, profile.address("max31343"))
+    with TimeSeries("rtc_temperature.ts") as ts:
+        for k in range(10):
+            ts.append(rtc.temperature())
+            time.sleep(1.0)
+        print(ts.last(10))
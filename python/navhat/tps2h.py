@@ -0,0 +1,299 @@
+"""
+Contol TPS2HBxx high side swithes via a MCP23017 port extender.
+The switches have a diagnostic mode, the current throuhg the load and the die temperature
+can be monitored. A diagnostic current is created which flows throuhg a sense resistor. The resulting voltage is fed to an ADC.
+"""
+
+import collections
+import time
+from . import ads1119, mcp23017, calibration
+
+# The board has 4 IOs, mapped to the lowest 4 Bits
+OUTPUT_MASK = 0x0f
+MAX_CHANNEL = 3
+
+DIAG_SELECT_1 = 0x01
+DIAG_SELECT_2 = 0x02
+# diagnostic select and enable pins of both switches on port A
+DIAG_MASK     = 0x0f
+
+# nominal current factor and sense resistor in Ohm, the values of the board are taken from its calibration
+SNS_CURRENT   = calibration.SNS_RATIO[calibration.VARIANT]
+SNS_RESISTOR  = calibration.SNS_RESISTOR
+
+# settling time of the sense output after switching diagnostic mode in s
+DIAG_SETTLE   = 0.1
+
+# result of a sweep for one output: current in A and die temperature in °C, each with the resolution of its reading
+Reading = collections.namedtuple("Reading", ("current", "current_resolution", "temperature", "temperature_resolution"))
+
+class TPS2H:
+    """
+    This class holds the high side switches.
+
+    :param io: a link to the port extender which controls the switches.
+    :type io: MCP23017 object
+    :param adc: a link to the ADC which is used to measure the diagnostic features.
+    :type adc: ADS1119 object
+    :param verbose: setting for printing verbosity information to the console, defaults to False.
+    :type verbose: boolean
+    :param cal: calibration of the board, defaults to the one loaded from the HAT EEPROM. Its reference voltage is applied to the ADC.
+    :type cal: calibration.Calibration
+    :param auto: measures with auto-ranging gain and datarate of the ADC, defaults to False.
+    :type auto: boolean
+    """
+    def __init__(self, io, adc, verbose = False, cal = None, auto = False):
+        self.io = io
+        self.adc = adc
+        self.verbose = verbose
+        self.cal = cal if cal is not None else calibration.load()
+        self.adc.vref = self.cal.vref
+        self.channel = 0x00
+        self.diag_channel = 0
+        self.diag_current = 0
+        self.diag_temperature = 0
+
+        # auto-ranging: required update rate in Hz of each channel, None for the lowest noise
+        self.auto = auto
+        self.rates = [None] * (MAX_CHANNEL + 1)
+        # resolution of the last reading in [A] or [°C]
+        self.resolution = None
+        
+    def setup(self):
+        """
+        Configures the pins of the port extender for outputs and diagnostic mode as outputs, other pins keep their direction.
+        Reads the state of the outputs, so a new process does not switch off outputs set by another one.
+        """
+        for port, mask in ((mcp23017.PORT_A, DIAG_MASK), (mcp23017.PORT_B, OUTPUT_MASK)):
+            direction = self.io.get_io_direction(port)
+            if direction & mask:
+                self.io.set_io_direction(port, direction & ~mask)
+        self.channel = self.io.get_io_pin(mcp23017.PORT_B) & OUTPUT_MASK
+        return self
+
+    def set_output(self, channel):
+        """
+        Activates one of the power outputs.
+    
+        :param channel: the channel that needs to be activated. Must be between 0 and 3.
+        :type channel: int
+        """
+        assert(channel >= 0 and channel <= MAX_CHANNEL)
+        self.channel = self.channel | (1 << channel)
+        self.io.set_io_output(mcp23017.PORT_B, self.channel)
+        return self
+
+    def clear_output(self, channel):
+        """
+        Deactivates one of the power outputs.
+    
+        :param channel: the channel that needs to be deactivated. Must be between 0 and 3.
+        :type channel: int
+        """
+        assert(channel >= 0 and channel <= MAX_CHANNEL)
+        self.channel = self.channel & ~(1 << (channel))
+        self.io.set_io_output(mcp23017.PORT_B, self.channel)
+
+        return self
+    
+    def diag(self, channel, current=0, temperature=0):
+        """
+        Activates diagnostic mode for a certain channel. It can be chosen between current measurement or die temperature.
+        If none of them are selected, diagnostic mode is turned off.
+        
+        :param channel: The channel for which diagnostic mode shall be selected.
+        :type channel: int
+        :param current: Set to True for current measurement.
+        :type current: boolean
+        :param temperature: Set to True for temperature measurement.
+        :type temperature: boolean
+        """
+        diag_pattern = self._diag_pattern(channel, current, temperature)
+        self.io.set_io_output(mcp23017.PORT_A, diag_pattern)
+        return self
+
+    def _diag_pattern(self, channel, current, temperature):
+        assert(channel >= 0 and channel <= MAX_CHANNEL)
+        self.diag_channel = channel
+        self.diag_current = current
+        self.diag_temperature = temperature
+        
+        #turn off diagnostic mode
+        if current == 0 and temperature == 0:
+            diag_pattern = 0x00
+        else:
+            ch = 1 << (int(channel /2) +2)
+            diag_pattern = ch
+            if current and channel & 0x01:
+                    diag_pattern = diag_pattern | DIAG_SELECT_2
+            if temperature:
+                diag_pattern = diag_pattern | DIAG_SELECT_1
+        #print("Diag: %02x" % diag_pattern)
+        return diag_pattern
+    
+    def measure(self):
+        """
+        Reads from the ADC and calculates temperature or current, based on what was selected.
+        
+        The resolution of the reading, given by gain and voltage reference of the ADC, is kept in self.resolution.
+        
+        :return: The reading of the selection. Units are [A] for current measurement, [°C] for temperature.
+        :rtype: float
+        :raises i2c_device.I2CError: if the ADC cannot be read or has no result ready.
+        """
+        if self.auto:
+            v, lsb = self.adc.read_auto(self._range_key(), self.rates[self.diag_channel])
+            return self._convert(v, lsb)
+        v = self.adc.read_voltage()
+        return self._convert(v, self.adc.resolution())
+
+    def _range_key(self):
+        # current and temperature of each channel are ranged separately
+        return (self.diag_channel, bool(self.diag_temperature))
+
+    def _convert(self, v, lsb = None):
+        if self.verbose:
+            print("v: %3.4f" % v)
+        
+        if self.diag_temperature:
+            convert = self.temperature
+        elif self.diag_current:
+            convert = self.current
+        else:
+            raise RuntimeError("diagnostic mode is off, select current or temperature first")
+        value = convert(v)
+        if lsb is not None:
+            self.resolution = abs(convert(lsb) - convert(0.0))
+        return value
+
+    def sweep(self, settle = DIAG_SETTLE):
+        """
+        Measures current and die temperature of all outputs one after the other. Diagnostic mode is turned off afterwards.
+        
+        :param settle: settling time after switching the diagnostic mode in [s], defaults to DIAG_SETTLE.
+        :type settle: float
+        :return: current in [A] and temperature in [°C] with their resolution for each channel.
+        :rtype: list of Reading
+        """
+        result = []
+        for channel in range(MAX_CHANNEL + 1):
+            self.diag(channel, current=1)
+            time.sleep(settle)
+            i = self.measure()
+            di = self.resolution
+            self.diag(channel, temperature=1)
+            time.sleep(settle)
+            t = self.measure()
+            result.append(Reading(i, di, t, self.resolution))
+        self.diag(0)
+        return result
+
+    # asyncio counterparts, the port extender and the ADC are accessed via the executor of their I2C bus
+    async def set_output_async(self, channel):
+        assert(channel >= 0 and channel <= MAX_CHANNEL)
+        self.channel = self.channel | (1 << channel)
+        await self.io.set_io_output_async(mcp23017.PORT_B, self.channel)
+        return self
+
+    async def clear_output_async(self, channel):
+        assert(channel >= 0 and channel <= MAX_CHANNEL)
+        self.channel = self.channel & ~(1 << (channel))
+        await self.io.set_io_output_async(mcp23017.PORT_B, self.channel)
+        return self
+
+    async def diag_async(self, channel, current=0, temperature=0):
+        diag_pattern = self._diag_pattern(channel, current, temperature)
+        await self.io.set_io_output_async(mcp23017.PORT_A, diag_pattern)
+        return self
+
+    async def measure_async(self):
+        if self.auto:
+            v, lsb = await self.adc.read_auto_async(self._range_key(), self.rates[self.diag_channel])
+            return self._convert(v, lsb)
+        v = await self.adc.read_voltage_async()
+        return self._convert(v, self.adc.resolution())
+
+    async def sweep_async(self, settle = DIAG_SETTLE):
+        """
+        asyncio counterpart of sweep(). The settling times do not block the event loop.
+        
+        :param settle: settling time after switching the diagnostic mode in [s], defaults to DIAG_SETTLE.
+        :type settle: float
+        :return: current in [A] and temperature in [°C] with their resolution for each channel.
+        :rtype: list of Reading
+        """
+        import asyncio
+        result = []
+        for channel in range(MAX_CHANNEL + 1):
+            await self.diag_async(channel, current=1)
+            await asyncio.sleep(settle)
+            i = await self.measure_async()
+            di = self.resolution
+            await self.diag_async(channel, temperature=1)
+            await asyncio.sleep(settle)
+            t = await self.measure_async()
+            result.append(Reading(i, di, t, self.resolution))
+        await self.diag_async(0)
+        return result
+    
+    # for TPS2H junction temperature. See section 9.3.3.2 of the datasheet for details.
+    def temperature(self, voltage, channel = None):
+        """
+        Calculates the calibrated die temperature of the switch based on the measured voltage.
+        
+        :param voltage: Measured voltage [V], a number or a NumPy array of samples.
+        :type voltage: float or numpy.ndarray
+        :param channel: The channel of the measurement, defaults to the channel in diagnostic mode.
+        :type channel: int
+        :return: calculated temperature in [°C]
+        :rtype: float or numpy.ndarray
+        """
+        if channel is None:
+            channel = self.diag_channel
+        return self.cal.temperature(voltage, channel)
+
+    def current(self, voltage, channel = None):
+        """
+        Calculates the calibrated current in the load based on the measured voltage.
+        
+        :param voltage: Measured voltage [V], a number or a NumPy array of samples.
+        :type voltage: float or numpy.ndarray
+        :param channel: The channel of the measurement, defaults to the channel in diagnostic mode.
+        :type channel: int
+        :return: calculated load current in [A]
+        :rtype: float or numpy.ndarray
+        """
+        if channel is None:
+            channel = self.diag_channel
+        return self.cal.current(voltage, channel)
+    
+    
+if __name__ == '__main__':
+
+    from . import board
+    profile = board.load()
+    ads=ads1119.ADS1119(profile.bus, profile.address("ads1119"), verbose = False)
+    gpio = mcp23017.MCP23017(profile.bus, profile.address("mcp23017"))
+    
+    ads.reset()
+    ads.continous = 1
+    ads.configure()
+    ads.start()
+    time.sleep(0.2)
+    
+    sw = TPS2H(gpio, ads, verbose = True)
+    sw.setup()
+    sw.set_output(0)
+
+    for k in range(3):
+        sw.diag(0, current=1)
+        time.sleep(0.1)
+        val = sw.measure()
+        print("Current: %3.2f" % val)
+    
+        sw.diag(0, temperature=1)
+        time.sleep(0.1)
+        val = sw.measure()
+        print("Temperature: %3.2f" % val)
+    
+    sw.clear_output(0)
@@ -0,0 +1,131 @@
+"""
+Fake smbus module for the driver tests. The devices are Python objects on a FakeBus, errors and the duration of
+the transfers can be set by the tests.
+"""
+
+import errno
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+try:
+    import smbus
+except ImportError:
+    # the drivers import smbus when they are imported, the i2c fixture replaces it in each test
+    sys.modules["smbus"] = types.ModuleType("smbus")
+
+
+class Device:
+    # registers of a plain I2C device, reads return the bytes written last
+    def __init__(self, registers = None):
+        self.registers = dict(registers or {})
+
+    def read(self, register, length):
+        return (list(self.registers.get(register, [])) + [0] * length)[:length]
+
+    def write(self, register, data):
+        self.registers[register] = list(data)
+
+
+class ADC(Device):
+    # ADS1119 converting the voltage of its input with the configured gain, a result is ready after ready_after polls
+    # since the start or the last result read
+    def __init__(self, voltage = 0.0, vref = 2.048, ready_after = 0):
+        super().__init__()
+        self.voltage = voltage
+        self.vref = vref
+        self.ready_after = ready_after
+        self.config = 0
+        self.polls = 0
+        self.conversions = []
+
+    @property
+    def gain(self):
+        return 4 if self.config & 0x10 else 1
+
+    def code(self):
+        code = round(self.voltage * self.gain / self.vref * 0x8000)
+        return max(-0x8000, min(0x7fff, code)) & 0xffff
+
+    def write(self, register, data):
+        if register == 0x40:
+            self.config = data[0]
+        elif register == 0x08:
+            self.polls = 0
+
+    def read(self, register, length):
+        if register == 0x24:
+            self.polls += 1
+            return [0x80 if self.ready_after is not None and self.polls > self.ready_after else 0x00]
+        if register == 0x20:
+            return [self.config]
+        if register == 0x10:
+            code = self.code()
+            self.conversions.append((self.gain, code))
+            self.polls = 0
+            return [code >> 8, code & 0xff]
+        return super().read(register, length)
+
+
+class FakeBus:
+    """
+    State shared by all handles of the fake smbus module.
+
+    devices: device by address. errors: errno raised by each of the next transfers. delay: duration of a transfer in s.
+    open_error: errno raised when a handle is opened.
+    """
+    def __init__(self):
+        self.devices = {}
+        self.errors = []
+        self.delay = 0.0
+        self.open_error = None
+        self.opened = []
+        self.transfers = []
+        self.lock = threading.Lock()
+
+    def transfer(self, number, addr, name):
+        with self.lock:
+            self.transfers.append((number, addr, name, time.monotonic()))
+            error = self.errors.pop(0) if self.errors else None
+        if self.delay:
+            time.sleep(self.delay)
+        if error is not None:
+            raise OSError(error, "fake error %d" % error)
+        if addr not in self.devices:
+            raise OSError(errno.ENXIO, "no device at 0x%02x" % addr)
+        return self.devices[addr]
+
+
+class SMBus:
+    def __init__(self, fake, number):
+        if fake.open_error is not None:
+            raise OSError(fake.open_error, "cannot open bus %s" % number)
+        self.fake = fake
+        self.number = number
+        fake.opened.append(number)
+
+    def read_byte(self, addr):
+        return self.fake.transfer(self.number, addr, "read_byte").read(0, 1)[0]
+
+    def read_i2c_block_data(self, addr, register, length):
+        return self.fake.transfer(self.number, addr, "read").read(register, length)
+
+    def write_i2c_block_data(self, addr, register, data):
+        self.fake.transfer(self.number, addr, "write").write(register, data)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def i2c(monkeypatch):
+    fake = FakeBus()
+    module = types.ModuleType("smbus")
+    module.SMBus = lambda number: SMBus(fake, number)
+    monkeypatch.setitem(sys.modules, "smbus", module)
+    from navhat import i2c_device
+    monkeypatch.setattr(i2c_device, "smbus", module)
+    return fake
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from conftest import ADC
+from navhat import ads1119
+
+ADDR = 0x48
+
+
+@pytest.fixture
+def adc(i2c):
+    i2c.devices[ADDR] = ADC()
+    device = ads1119.ADS1119(1, ADDR)
+    device.vref = 2.048
+    device.reset()
+    device.continous = 1
+    device.configure()
+    device.start()
+    return device
+
+
+@pytest.mark.parametrize("rate, datarate", [(None, 0), (1, 0), (20, 0), (21, 1), (90, 1), (300, 2), (1000, 3), (5000, 3)])
+def test_datarate_for(rate, datarate):
+    assert ads1119.datarate_for(rate) == datarate
+
+
+@pytest.mark.parametrize("code, value", [(0x0000, 0), (0x7fff, 0x7fff), (0x8000, -0x8000), (0xffff, -1), (0xff38, -200)])
+def test_signed(code, value):
+    assert ads1119._signed(code) == value
+
+
+def test_negative_voltage(i2c, adc):
+    i2c.devices[ADDR].voltage = -0.5
+    assert adc.read_voltage() == pytest.approx(-0.5, abs=adc.resolution())
+    adc.gain = 4
+    adc.configure()
+    i2c.devices[ADDR].voltage = -0.25
+    assert adc.read_voltage() == pytest.approx(-0.25, abs=adc.resolution())
+
+
+def test_auto_switches_up_to_gain_4(i2c, adc):
+    i2c.devices[ADDR].voltage = 0.1
+    v, lsb = adc.read_auto("a")
+    assert (adc.gain, lsb) == (1, pytest.approx(2.048 / 0x8000))
+    assert adc.ranges["a"] == 4
+    v, lsb = adc.read_auto("a")
+    assert adc.gain == 4
+    assert lsb == pytest.approx(2.048 / 4 / 0x8000)
+    assert v == pytest.approx(0.1, abs=lsb)
+
+
+def test_auto_stays_at_gain_1_near_the_limit(i2c, adc):
+    i2c.devices[ADDR].voltage = 0.45
+    adc.read_auto("a")
+    assert adc.ranges["a"] == 1
+
+
+def test_auto_repeats_saturated_reading(i2c, adc):
+    device = i2c.devices[ADDR]
+    device.voltage = 0.05
+    adc.read_auto("a")
+    adc.read_auto("a")
+    device.voltage = -1.2
+    device.conversions.clear()
+    v, lsb = adc.read_auto("a")
+    # saturated at gain 4, the result converted before the restart is discarded, then read at gain 1
+    assert [gain for gain, code in device.conversions] == [4, 1, 1]
+    assert adc.gain == 1
+    assert adc.ranges["a"] == 1
+    assert v == pytest.approx(-1.2, abs=lsb)
+
+
+def test_auto_keeps_range_per_signal(i2c, adc):
+    device = i2c.devices[ADDR]
+    device.voltage = 0.1
+    adc.read_auto("small")
+    device.voltage = 1.5
+    adc.read_auto("large")
+    assert adc.ranges == {"small": 4, "large": 1}
+
+
+def test_fast_datarate_reads_fast(i2c, adc):
+    device = i2c.devices[ADDR]
+    device.voltage = 1.0
+    device.ready_after = 2
+    adc.read_auto("a", 1000)
+    start = time.monotonic()
+    for k in range(10):
+        adc.read_auto("a", 1000)
+    assert (time.monotonic() - start) / 10 < 0.008
+
+
+def test_restart_only_on_new_configuration(i2c, adc):
+    i2c.devices[ADDR].voltage = 1.0
+    adc.read_auto("a")
+    writes = len([t for t in i2c.transfers if t[2] == "write"])
+    adc.read_auto("a")
+    assert len([t for t in i2c.transfers if t[2] == "write"]) == writes
+    adc.read_auto("b", 1000)
+    assert len([t for t in i2c.transfers if t[2] == "write"]) > writes
+
+
+def test_vref_from_calibration(i2c, monkeypatch):
+    from navhat import calibration
+    monkeypatch.setattr(calibration, "_cached", calibration.Calibration(vref=2.5))
+    i2c.devices[ADDR] = ADC(voltage=1.25, vref=2.5)
+    adc = ads1119.ADS1119(1, ADDR)
+    assert adc.vref == 2.5
+    assert adc.read_voltage() == pytest.approx(1.25, abs=adc.resolution())
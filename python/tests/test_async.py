@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import ADC, Device
+from navhat import ads1119, calibration, i2c_device, max31343, mcp23017, tps2h
+
+DELAY = 0.05
+
+
+@pytest.mark.parametrize("name", [1, "1", "i2c-1", "/dev/i2c-1"])
+def test_one_executor_per_bus(name):
+    assert i2c_device.bus_key(name) == 1
+    assert i2c_device.bus_executor(name) is i2c_device.bus_executor(1)
+    assert i2c_device.bus_executor(2) is not i2c_device.bus_executor(1)
+
+
+async def ticker(ticks, stop):
+    # counts while other coroutines wait for the bus, the largest gap shows if the event loop was blocked
+    last = time.monotonic()
+    while not stop.is_set():
+        await asyncio.sleep(0.002)
+        now = time.monotonic()
+        ticks.append(now - last)
+        last = now
+
+
+async def with_ticker(coroutine):
+    ticks = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(ticks, stop))
+    result = await coroutine
+    stop.set()
+    await task
+    return result, ticks
+
+
+def test_buses_run_in_parallel(i2c):
+    i2c.delay = DELAY
+    i2c.devices[0x20] = Device({0x00: [7]})
+    devices = [i2c_device.i2c_device(bus, 0x20) for bus in (3, 4)]
+
+    async def both():
+        return await asyncio.gather(*(d.read_async(0x00, 1) for d in devices for k in range(3)))
+
+    start = time.monotonic()
+    assert asyncio.run(both()) == [[7]] * 6
+    assert time.monotonic() - start < 5 * DELAY
+
+
+def test_same_bus_is_serialized(i2c):
+    i2c.delay = DELAY
+    i2c.devices[0x20] = Device()
+    i2c.devices[0x21] = Device()
+    devices = [i2c_device.i2c_device(5, 0x20), i2c_device.i2c_device("i2c-5", 0x21)]
+
+    async def both():
+        await asyncio.gather(*(d.read_async(0x00, 1) for d in devices for k in range(2)))
+
+    asyncio.run(both())
+    times = sorted(t for bus, addr, name, t in i2c.transfers)
+    assert all(b - a >= DELAY * 0.9 for a, b in zip(times, times[1:]))
+
+
+def test_read_data_async_does_not_block(i2c):
+    i2c.delay = DELAY
+    i2c.devices[0x48] = ADC(voltage=1.024, ready_after=1)
+    adc = ads1119.ADS1119(6, 0x48)
+    value, ticks = asyncio.run(with_ticker(adc.read_data_async()))
+    assert value == 0x4000
+    assert len(ticks) > 20
+    assert max(ticks) < DELAY
+
+
+def test_set_alarm2_async_does_not_block(i2c):
+    i2c.delay = DELAY
+    i2c.devices[0x68] = Device()
+    rtc = max31343.MAX31343(6, 0x68)
+    result, ticks = asyncio.run(with_ticker(rtc.set_alarm2_async(7, 30)))
+    assert len(ticks) > 5
+    assert max(ticks) < DELAY
+
+
+def test_sweep_async_does_not_block(i2c):
+    i2c.delay = 0.02
+    i2c.devices[0x22] = Device()
+    i2c.devices[0x48] = ADC(voltage=0.1)
+    io = mcp23017.MCP23017(7, 0x22)
+    adc = ads1119.ADS1119(7, 0x48)
+    sw = tps2h.TPS2H(io, adc, cal=calibration.Calibration(), auto=True).setup()
+    adc.start()
+    result, ticks = asyncio.run(with_ticker(sw.sweep_async(0.01)))
+    assert len(result) == tps2h.MAX_CHANNEL + 1
+    assert result[0].current_resolution > 0
+    assert len(ticks) > 20
+    assert max(ticks) < 0.02
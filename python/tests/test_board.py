@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from conftest import Device
+from navhat import board
+
+
+@pytest.fixture
+def hat(tmp_path, monkeypatch):
+    monkeypatch.setattr(board, "HAT_UUID", str(tmp_path / "uuid"))
+    return tmp_path
+
+
+def populate(i2c, a0):
+    for name, (base, shifted) in board.DEVICES.items():
+        if name != "bmp390":
+            i2c.devices[base + a0 if shifted else base] = Device()
+
+
+@pytest.mark.parametrize("a0", [0, 1])
+def test_discover(i2c, hat, a0):
+    populate(i2c, a0)
+    profile = board.discover(1)
+    assert profile.a0 == a0
+    assert profile.devices == {"mcp23017": 0x22 + a0, "ads1119": 0x48 + a0, "max31343": 0x68}
+    assert profile.uuid is None
+    with pytest.raises(LookupError):
+        profile.address("bmp390")
+
+
+def test_load_uses_cache(i2c, hat):
+    cache = str(hat / "board.json")
+    populate(i2c, 1)
+    profile = board.load(1, cache=cache)
+    assert profile.address("ads1119") == 0x49
+    i2c.devices.clear()
+    assert board.load(1, cache=cache).devices == profile.devices
+    assert board.load(1, rescan=True, cache=cache).devices == {}
+
+
+def test_load_discards_cache_of_other_hat(i2c, hat):
+    cache = str(hat / "board.json")
+    populate(i2c, 0)
+    board.load(1, cache=cache)
+    (hat / "uuid").write_bytes(b"1234\0")
+    i2c.devices.clear()
+    populate(i2c, 1)
+    profile = board.load(1, cache=cache)
+    assert profile.uuid == "1234"
+    assert profile.a0 == 1
+
+
+def test_load_does_not_cache_missing_outputs(i2c, hat):
+    cache = hat / "board.json"
+    profile = board.load(1, cache=str(cache))
+    assert profile.devices == {}
+    assert not cache.exists()
+    populate(i2c, 0)
+    assert board.load(1, cache=str(cache)).address("mcp23017") == 0x22
+    assert json.loads(cache.read_text())["devices"]["ads1119"] == 0x48
+
+
+def test_load_ignores_incomplete_cache(i2c, hat):
+    cache = hat / "board.json"
+    cache.write_text(json.dumps({"bus": 1, "a0": 0, "devices": {}, "uuid": None}))
+    populate(i2c, 0)
+    assert board.load(1, cache=str(cache)).complete()
@@ -0,0 +1,59 @@
+import pytest
+
+from navhat import calibration
+from navhat.calibration import Calibration
+
+
+def board():
+    cal = Calibration("TPS2HB32", 748.5, 2.051)
+    cal.current_offset = [0.01, -0.02, 0.0, 0.03]
+    cal.current_gain = [1.02, 1.01, 0.99, 1.0]
+    cal.temperature_offset = [-1.5, 0.5, 0.0, 2.0]
+    cal.temperature_gain = [1.0, 0.98, 1.03, 1.0]
+    return cal
+
+
+def test_pack_unpack():
+    cal = board()
+    data = cal.pack()
+    assert len(data) == calibration.HEADER.size + calibration.TABLE.size
+    copy = Calibration.unpack(data)
+    assert copy.variant == "TPS2HB32"
+    assert copy.sns_resistor == pytest.approx(748.5)
+    assert copy.vref == pytest.approx(2.051)
+    for name in ("current_offset", "current_gain", "temperature_offset", "temperature_gain"):
+        assert getattr(copy, name) == pytest.approx(getattr(cal, name))
+    assert copy.current(0.5, 1) == pytest.approx(cal.current(0.5, 1))
+
+
+def test_unpack_rejects_other_atoms():
+    data = board().pack()
+    assert Calibration.unpack(data[:-1]) is None
+    assert Calibration.unpack(b"XXXX" + data[4:]) is None
+    assert Calibration.unpack(data[:4] + b"\x02\x00" + data[6:]) is None
+    assert Calibration.unpack(data[:6] + b"\x01\x00" + data[8:]) is None
+
+
+def test_load(tmp_path):
+    (tmp_path / "custom_0").write_bytes(b"vendor data")
+    (tmp_path / "custom_1").write_bytes(board().pack())
+    cal = calibration.load(str(tmp_path / "custom_*"), reload=True)
+    assert cal.variant == "TPS2HB32"
+    assert calibration.load() is cal
+    cal = calibration.load(str(tmp_path / "missing_*"), reload=True)
+    assert cal.variant == calibration.VARIANT
+    assert cal.current_gain == [1.0] * calibration.CHANNELS
+
+
+def test_arrays():
+    numpy = pytest.importorskip("numpy")
+    cal = board()
+    voltages = numpy.array([0.1, 0.2, 0.3, 0.4, 0.5])
+    channels = numpy.array([0, 1, 2, 3, 1])
+    currents = cal.current(voltages, channels)
+    temperatures = cal.temperature(voltages, channels)
+    assert currents.shape == temperatures.shape == (5,)
+    assert list(currents) == pytest.approx([cal.current(float(v), int(c)) for v, c in zip(voltages, channels)])
+    assert list(temperatures) == pytest.approx([cal.temperature(float(v), int(c)) for v, c in zip(voltages, channels)])
+    # a block of samples of one output
+    assert list(cal.current(voltages, 2)) == pytest.approx([cal.current(float(v), 2) for v in voltages])
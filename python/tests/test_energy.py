@@ -0,0 +1,143 @@
+import pytest
+
+from navhat.energy import EnergyLog
+
+TIERS = ((1, 3 * 3600), (60, 24 * 3600), (3600, 30 * 24 * 3600))
+T0 = 1000000 * 3600.0
+
+
+def crash(log):
+    # stops without writing the open buckets
+    for tier in log.tiers:
+        tier.file.close()
+
+
+def test_integrates_at_the_sweep_period(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS, period=30.0)
+    for k in range(0, 2 * 3600 + 1, 30):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    assert log.amp_hours(0, T0, T0 + 2 * 3600 + 1) == pytest.approx(2.0)
+    assert log.summary(0, T0, T0 + 2 * 3600 + 1).gap == 0.0
+
+
+def test_gap_is_counted_not_integrated(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS, max_gap=10.0)
+    log.add(1, 2.0, T0)
+    log.add(1, 2.0, T0 + 5)
+    log.add(1, 2.0, T0 + 605)
+    log.flush()
+    stats = log.summary(1, T0, T0 + 3600)
+    assert stats.ah == pytest.approx(2.0 * 5 / 3600)
+    assert stats.gap == pytest.approx(600.0)
+
+
+def test_rollup_matches_finest_tier(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(3 * 3600):
+        log.add(0, 1.0 + (k % 7), T0 + k)
+        log.add(2, 0.5, T0 + k)
+    log.flush()
+    fine = list(log.tiers[0].file.records())
+    # the last hour is still open and taken from the finer tiers
+    hours = [(t, stats) for t, ch, stats in log.tiers[2].file.records() if ch == 0]
+    assert [t for t, stats in hours] == [T0, T0 + 3600]
+    assert sum(stats.count for t, stats in hours) == 2 * 3600
+    assert sum(stats.ah for t, stats in hours) == pytest.approx(sum(s.ah for t, ch, s in fine if ch == 0 and t < T0 + 7200))
+    assert log.summary(0, T0, T0 + 3 * 3600).count == 3 * 3600
+    stats = log.summary(0, T0 + 1800, T0 + 7230)
+    assert stats.count == 7230 - 1800
+    assert stats.min == 1.0 and stats.max == 7.0
+    assert log.amp_hours(2, T0, T0 + 3 * 3600) == pytest.approx(0.5 * (3 * 3600 - 1) / 3600)
+
+
+def test_records_of_a_period(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(600):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    starts = [t for t, ch, stats in log.tiers[0].file.records(T0 + 100, T0 + 110)]
+    assert starts == [T0 + k for k in range(100, 110)]
+
+
+def test_records_after_wrap(tmp_path):
+    log = EnergyLog(str(tmp_path), channels=1, tiers=((1, 100), (60, 3600)))
+    for k in range(250):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    starts = [t for t, ch, stats in log.tiers[0].file.records()]
+    assert starts == [T0 + k for k in range(150, 250)]
+    assert [t for t, ch, stats in log.tiers[0].file.records(T0 + 180, T0 + 185)] == [T0 + k for k in range(180, 185)]
+
+
+def test_unclean_stop(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(2 * 3600 + 1):
+        log.add(0, 1.0, T0 + k)
+    crash(log)
+
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    assert log.amp_hours(0, T0, T0 + 2 * 3600) == pytest.approx(2.0, abs=0.001)
+    for k in range(2 * 3600 + 1, 3 * 3600 + 120):
+        log.add(0, 1.0, T0 + k)
+    log.close()
+
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    hours = [stats.count for t, ch, stats in log.tiers[2].file.records() if ch == 0]
+    assert hours == [3600, 3600, 3599]
+    assert log.amp_hours(0, T0, T0 + 3 * 3600) == pytest.approx(3.0, abs=0.001)
+    log.close()
+
+
+def test_channels_at_different_rates(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS, max_gap=10.0)
+    times = {0: range(0, 2 * 3600, 1), 1: range(0, 2 * 3600, 5), 2: range(3, 2 * 3600, 7)}
+    for k in range(2 * 3600):
+        for channel, ts in times.items():
+            if k in ts:
+                log.add(channel, 1.0, T0 + k)
+    log.flush()
+    starts = [t for t, ch, stats in log.tiers[0].file.records()]
+    assert starts == sorted(starts)
+    assert log.summary(1, T0 + 7, T0 + 12).count == 1
+    random = __import__("random").Random(1)
+    for n in range(300):
+        a = random.randrange(0, 2 * 3600)
+        b = random.randrange(a, 2 * 3600 + 1)
+        for channel, ts in times.items():
+            assert log.summary(channel, T0 + a, T0 + b).count == len([k for k in ts if a <= k < b]), (channel, a, b)
+
+
+def test_flush_and_continue(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(1800):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    for k in range(1800, 2700):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    assert log.summary(0, T0, T0 + 2700).count == 2700
+    assert log.summary(0, T0, T0 + 3600).count == 2700
+    log.close()
+
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(2700, 3720):
+        log.add(0, 1.0, T0 + k)
+    log.flush()
+    assert [stats.count for t, ch, stats in log.tiers[2].file.records()] == [3600]
+    assert log.summary(0, T0, T0 + 3600).count == 3600
+    assert log.amp_hours(0, T0, T0 + 3600) == pytest.approx(3599 / 3600, abs=0.001)
+
+
+def test_channel_out_of_range(tmp_path):
+    log = EnergyLog(str(tmp_path), channels=2, tiers=TIERS)
+    with pytest.raises(ValueError):
+        log.add(2, 1.0, T0)
+
+
+def test_add_sweep(tmp_path):
+    log = EnergyLog(str(tmp_path), tiers=TIERS)
+    for k in range(11):
+        log.add_sweep([(1.0, 0.0003, 30.0, 0.008), (0.0, 0.0003, 25.0, 0.008)] * 2, T0 + k)
+    log.flush()
+    assert [log.amp_hours(ch, T0, T0 + 11) for ch in range(4)] == pytest.approx([10 / 3600, 0.0] * 2)
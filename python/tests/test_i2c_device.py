@@ -0,0 +1,105 @@
+import errno
+import time
+
+import pytest
+
+from conftest import ADC, Device
+from navhat import ads1119, i2c_device
+
+ADDR = 0x20
+
+
+@pytest.fixture
+def device(i2c):
+    i2c.devices[ADDR] = Device({0x10: [1, 2, 3]})
+    return i2c_device.i2c_device(1, ADDR)
+
+
+def transfers(i2c):
+    return len([t for t in i2c.transfers if t[1] == ADDR])
+
+
+@pytest.mark.parametrize("error", i2c_device.RETRY_ERRNOS)
+def test_retried(i2c, device, error):
+    i2c.errors = [error, error]
+    assert device.read(0x10, 3) == [1, 2, 3]
+    assert transfers(i2c) == 3
+    assert i2c.opened == [1]
+
+
+def test_retry_count(i2c, device):
+    i2c.errors = [errno.EIO] * 10
+    with pytest.raises(i2c_device.I2CError) as e:
+        device.write(0x10, [4])
+    assert e.value.errno == errno.EIO
+    assert not isinstance(e.value, i2c_device.I2CTimeout)
+    assert transfers(i2c) == i2c_device.RETRIES + 1
+
+
+def test_backoff(i2c, device):
+    i2c.errors = [errno.EIO] * 3
+    start = time.monotonic()
+    device.read(0x10, 1)
+    elapsed = time.monotonic() - start
+    assert elapsed >= i2c_device.BACKOFF * (1 + 2 + 4)
+
+
+@pytest.mark.parametrize("error", i2c_device.REOPEN_ERRNOS)
+def test_reopen(i2c, device, error):
+    i2c.errors = [error]
+    assert device.read(0x10, 1) == [1]
+    assert i2c.opened == [1, 1]
+    assert transfers(i2c) == 2
+
+
+def test_reopen_fails(i2c, device):
+    i2c.errors = [errno.EREMOTEIO]
+    i2c.open_error = errno.ENOENT
+    with pytest.raises(i2c_device.I2CError) as e:
+        device.read(0x10, 1)
+    assert e.value.errno == errno.ENOENT
+    assert transfers(i2c) == 1
+
+
+def test_other_errors_fail_at_once(i2c, device):
+    i2c.errors = [errno.EINVAL]
+    with pytest.raises(i2c_device.I2CError) as e:
+        device.read(0x10, 1)
+    assert e.value.errno == errno.EINVAL
+    assert transfers(i2c) == 1
+
+
+def test_errors_are_oserrors(i2c, device):
+    i2c.errors = [errno.EINVAL]
+    with pytest.raises(OSError):
+        device.read(0x10, 1)
+
+
+def test_deadline(i2c, device):
+    i2c.errors = [errno.EIO] * 10
+    with pytest.raises(i2c_device.I2CTimeout) as e:
+        device.read(0x10, 1, timeout=0.005)
+    assert e.value.errno == errno.ETIMEDOUT
+    assert transfers(i2c) < i2c_device.RETRIES + 1
+    with pytest.raises(i2c_device.I2CTimeout):
+        device.read(0x10, 1, timeout=0)
+
+
+def test_adc_never_ready(i2c):
+    i2c.devices[0x48] = ADC(ready_after=None)
+    adc = ads1119.ADS1119(1, 0x48)
+    start = time.monotonic()
+    with pytest.raises(i2c_device.I2CTimeout):
+        adc.read_data()
+    elapsed = time.monotonic() - start
+    assert adc.read_timeout() <= elapsed < adc.read_timeout() + 0.05
+    start = time.monotonic()
+    with pytest.raises(i2c_device.I2CTimeout):
+        adc.read_data(timeout=0.02)
+    assert time.monotonic() - start < 0.05
+
+
+def test_adc_ready_after_polls(i2c):
+    i2c.devices[0x48] = ADC(voltage=1.024, ready_after=3)
+    adc = ads1119.ADS1119(1, 0x48)
+    assert adc.read_data() == 0x4000
@@ -0,0 +1,125 @@
+import json
+import time
+
+import pytest
+
+from navhat.signalk import KELVIN, PATHS, Publisher, run
+
+
+class Stream:
+    # collects the messages, fails while broken is set
+    def __init__(self):
+        self.messages = []
+        self.broken = False
+
+    def send(self, message):
+        if self.broken:
+            raise OSError("not connected")
+        self.messages.append(json.loads(message))
+
+    def values(self, n = -1):
+        return {v["path"]: v["value"] for v in self.messages[n]["updates"][0]["values"]}
+
+
+RULES = {"current": (1.0, 0.05), "state": (0.0, 0.0)}
+
+
+def test_first_value_is_sent():
+    stream = Stream()
+    publisher = Publisher(stream, RULES)
+    assert publisher.update("a", 1.0, "current").flush(100.0) == 1
+    assert stream.values() == {"a": 1.0}
+
+
+def test_min_period():
+    publisher = Publisher(Stream(), RULES)
+    publisher.update("a", 1.0, "current").flush(100.0)
+    assert publisher.update("a", 2.0, "current").flush(100.5) == 0
+    assert publisher.flush(101.0) == 1
+
+
+def test_deadband():
+    stream = Stream()
+    publisher = Publisher(stream, RULES)
+    publisher.update("a", 1.0, "current").flush(100.0)
+    assert publisher.update("a", 1.04, "current").flush(102.0) == 0
+    assert publisher.update("a", 0.9, "current").flush(103.0) == 1
+    assert stream.values() == {"a": 0.9}
+    # compared to the value sent, not to the last update
+    assert publisher.update("a", 0.94, "current").flush(104.0) == 0
+    assert publisher.update("a", 0.96, "current").flush(105.0) == 1
+
+
+def test_without_rule_every_change_is_sent():
+    publisher = Publisher(Stream(), RULES)
+    publisher.update("b", "on").flush(100.0)
+    assert publisher.flush(100.1) == 0
+    assert publisher.update("b", "off").flush(100.1) == 1
+
+
+def test_booleans_are_not_numbers():
+    publisher = Publisher(Stream(), RULES)
+    publisher.update("s", False, "current").flush(100.0)
+    assert publisher.update("s", True, "current").flush(101.0) == 1
+
+
+def test_resent_after_failure():
+    stream = Stream()
+    publisher = Publisher(stream, RULES)
+    stream.broken = True
+    with pytest.raises(OSError):
+        publisher.update("a", 1.0, "current").flush(100.0)
+    stream.broken = False
+    assert publisher.flush(100.1) == 1
+
+
+def test_add_outputs():
+    stream = Stream()
+    publisher = Publisher(stream)
+    publisher.add_outputs(0x05, [(0.5, 0.0003, 30.0, 0.008)] * 4).flush(100.0)
+    values = stream.values()
+    assert [values[PATHS["state"] % k] for k in range(4)] == [True, False, True, False]
+    assert values[PATHS["current"] % 3] == 0.5
+    assert values[PATHS["temperature"] % 3] == pytest.approx(30.0 + KELVIN)
+    publisher.add_outputs(0x04).flush(100.1)
+    assert stream.values() == {PATHS["state"] % 0: False}
+
+
+class Switches:
+    # stand-in for TPS2H, the port reads the outputs set by another process
+    def __init__(self, duration, sweeps):
+        self.io = self
+        self.channel = 0x00
+        self.duration = duration
+        self.sweeps = sweeps
+
+    def get_io_pin(self, port):
+        return 0xf3
+
+    def sweep(self):
+        if not self.sweeps:
+            raise KeyboardInterrupt
+        self.sweeps -= 1
+        time.sleep(self.duration)
+        return [(0.5, 0.0003, 30.0, 0.008)] * 4
+
+
+class RTC:
+    def temperature(self):
+        raise OSError(121, "Remote I/O error")
+
+
+def test_run_publishes_port_state(capsys):
+    stream = Stream()
+    with pytest.raises(KeyboardInterrupt):
+        run(Publisher(stream), Switches(0.0, 1), RTC(), 0.01)
+    values = stream.values()
+    assert [values[PATHS["state"] % k] for k in range(4)] == [True, True, False, False]
+    assert PATHS["rtc"] not in values
+    assert "RTC not read" in capsys.readouterr().out
+
+
+def test_run_warns_if_too_slow(capsys):
+    with pytest.raises(KeyboardInterrupt):
+        run(Publisher(Stream()), Switches(0.03, 3), None, 0.02)
+    assert capsys.readouterr().out.count("longer than the period") == 1
@@ -0,0 +1,110 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from navhat.timeseries import HEADER, TimeSeries
+
+
+def crash(ts):
+    # stops without a checkpoint, the mapped records and counters stay in the file
+    ts.mm.close()
+    ts.f.close()
+
+
+def test_wrap(tmp_path):
+    path = str(tmp_path / "a.ts")
+    with TimeSeries(path, capacity=10) as ts:
+        for k in range(25):
+            ts.append(float(k), t=100.0 + k)
+        assert len(ts) == 10
+        older, newer = ts.segments()
+        assert list(older["t"]) + list(newer["t"]) == [115.0 + k for k in range(10)]
+        assert list(ts.window(118.0, 121.0)["value"]) == [18.0, 19.0, 20.0]
+        assert list(ts.last(3)["t"]) == [122.0, 123.0, 124.0]
+        assert list(ts.last(7)["t"]) == [118.0 + k for k in range(7)]
+
+
+def test_reader(tmp_path):
+    path = str(tmp_path / "a.ts")
+    with TimeSeries(path, fields=(("p", "f"), ("n", "H")), capacity=10) as ts:
+        ts.append(1.5, 7, t=100.0)
+        reader = TimeSeries(path, readonly=True)
+        assert list(reader.window(0.0)["n"]) == [7]
+        reader.close()
+
+
+def test_reopen_after_crash(tmp_path):
+    path = str(tmp_path / "a.ts")
+    ts = TimeSeries(path, capacity=10)
+    for k in range(15):
+        ts.append(float(k), t=100.0 + k)
+    ts.checkpoint()
+    for k in range(15, 22):
+        ts.append(float(k), t=100.0 + k)
+    crash(ts)
+
+    with TimeSeries(path) as ts:
+        assert ts.count() == 22
+        assert list(ts.window(106.0, 114.0)["t"]) == [112.0, 113.0]
+        assert list(ts.window(0.0)["t"]) == [112.0 + k for k in range(10)]
+
+
+def test_reopen_drops_records_out_of_order(tmp_path):
+    path = str(tmp_path / "a.ts")
+    ts = TimeSeries(path, capacity=10)
+    for k in range(15):
+        ts.append(float(k), t=100.0 + k)
+    ts.checkpoint()
+    for k in range(15, 22):
+        ts.append(float(k), t=100.0 + k)
+    # record 18 was not written to the storage
+    ts.record.pack_into(ts.mm, HEADER.size + 8 * ts.record.size, 50.0, 0.0)
+    crash(ts)
+
+    with TimeSeries(path) as ts:
+        assert ts.count() == 18
+        assert list(ts.window(0.0)["t"]) == [112.0 + k for k in range(6)]
+        ts.append(30.0, t=130.0)
+        assert list(ts.window(0.0)["t"]) == [112.0 + k for k in range(6)] + [130.0]
+        assert list(ts.last(2)["t"]) == [117.0, 130.0]
+
+
+def test_dtype_uses_struct_sizes(tmp_path):
+    fields = (("a", "l"), ("b", "L"), ("c", "h"), ("d", "d"))
+    with TimeSeries(str(tmp_path / "a.ts"), fields=fields, capacity=4) as ts:
+        assert ts.dtype().itemsize == ts.record.size
+        ts.append(-5, 6, -7, 8.5, t=100.0)
+        record = ts.last(1)[0]
+        assert (record["a"], record["b"], record["c"], record["d"]) == (-5, 6, -7, 8.5)
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        TimeSeries(str(tmp_path / "a.ts"), fields=(("name", "8s"),))
+
+
+def test_schema_must_fit_the_header(tmp_path):
+    path = tmp_path / "a.ts"
+    fields = tuple(("field_number_%02d" % k, "f") for k in range(8))
+    with pytest.raises(ValueError):
+        TimeSeries(str(path), fields=fields)
+    assert not path.exists()
+    fields = tuple(("f%02d" % k, "f") for k in range(16))
+    with TimeSeries(str(path), fields=fields, capacity=4):
+        pass
+    with TimeSeries(str(path)) as ts:
+        assert ts.fields == fields
+
+
+@pytest.mark.parametrize("name", ["a:b", "a,b", ""])
+def test_field_names(tmp_path, name):
+    with pytest.raises(ValueError):
+        TimeSeries(str(tmp_path / "a.ts"), fields=((name, "f"),))
+
+
+def test_close_with_array_in_use(tmp_path):
+    ts = TimeSeries(str(tmp_path / "a.ts"), capacity=4)
+    ts.append(1.0, t=100.0)
+    values = ts.window(0.0)
+    ts.close()
+    assert list(values["value"]) == [1.0]